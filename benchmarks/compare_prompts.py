@@ -0,0 +1,118 @@
+"""
+Compare prompt sets (legacy vs compact) on the fake backend.
+
+For every content type this reports the prompt and output tokens per call,
+the latency of a call and whether the reply still parsed completely:
+
+    python benchmarks/compare_prompts.py
+    python benchmarks/compare_prompts.py --calls 50 --latency-per-token 0.0005 --output prompts.json
+
+Token counts are the fake backend's estimate (four characters per token), and
+its latency grows with `--latency-per-token` for every prompt and output
+token, so the numbers show relative rather than absolute Gemini costs.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+os.environ["SENTENSNAP_CACHE_DIR"] = tempfile.mkdtemp(prefix="sentensnap-prompts-")
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+from backends import FakeBackend  # noqa: E402
+from definition_cache import DefinitionCache  # noqa: E402
+from metrics import TokenUsage  # noqa: E402
+from prompts import PROMPT_SETS  # noqa: E402
+from results import Book, Definition, Knowledge, Quote  # noqa: E402
+from senten_snap import SentenSnap  # noqa: E402
+
+BATCH_WORDS = [f"word{i}" for i in range(15)]
+
+# Content type -> (call on a SentenSnap for call number i, expected fields of each result)
+CASES = {
+    "quote": (lambda snap, i: [snap.generate_random_quote()], Quote.LABELS),
+    "knowledge": (lambda snap, i: [snap.generate_random_knowledge()], Knowledge.LABELS),
+    "book": (lambda snap, i: [snap.generate_random_book()], Book.LABELS),
+    "definition": (lambda snap, i: [snap.define_word(f"ephemeral{i}")], Definition.LABELS),
+    "batch_definition_15": (
+        lambda snap, i: list(snap.define_words([f"{word}_{i}" for word in BATCH_WORDS]).values()),
+        Definition.LABELS,
+    ),
+}
+
+
+def run_case(prompt_set, case, calls, latency, latency_per_token):
+    generate, fields = CASES[case]
+    usage = TokenUsage()
+    snap = SentenSnap(
+        cache=DefinitionCache(path=None, memory_size=0),
+        model=FakeBackend(latency=latency, latency_per_token=latency_per_token),
+        providers=[],
+        prompts=PROMPT_SETS[prompt_set],
+        usage=usage,
+    )
+    latencies = []
+    complete = 0
+    results = 0
+    for i in range(calls):
+        start = time.perf_counter()
+        for result in generate(snap, i):
+            results += 1
+            complete += all(result.get(field) for field in fields)
+        latencies.append(time.perf_counter() - start)
+    api_calls = sum(row["calls"] for row in usage.rows())
+    return {
+        "api_calls": api_calls,
+        "prompt_tokens_per_call": usage.prompt_tokens / api_calls,
+        "output_tokens_per_call": usage.output_tokens / api_calls,
+        "latency_ms": statistics.mean(latencies) * 1e3,
+        "complete": complete / results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare SentenSnap prompt sets on the fake backend.")
+    parser.add_argument("--sets", nargs=2, default=["legacy", "compact"], choices=sorted(PROMPT_SETS),
+                        help="Baseline and candidate prompt sets (default: legacy compact).")
+    parser.add_argument("--calls", type=int, default=10, help="Calls per content type and set (default: 10).")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fixed fake latency per call in seconds.")
+    parser.add_argument("--latency-per-token", type=float, default=0.0002,
+                        help="Extra fake latency per prompt/output token in seconds.")
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = args.sets
+    results = {
+        case: {
+            prompt_set: run_case(prompt_set, case, args.calls, args.latency, args.latency_per_token)
+            for prompt_set in (baseline, candidate)
+        }
+        for case in CASES
+    }
+
+    print(f"{'content type':22s} {'prompt tok':>17s} {'output tok':>17s} {'latency ms':>17s} {'complete':>13s}")
+    for case, by_set in results.items():
+        before, after = by_set[baseline], by_set[candidate]
+        print(
+            f"{case:22s} "
+            f"{before['prompt_tokens_per_call']:7.0f} -> {after['prompt_tokens_per_call']:6.0f} "
+            f"{before['output_tokens_per_call']:7.0f} -> {after['output_tokens_per_call']:6.0f} "
+            f"{before['latency_ms']:7.1f} -> {after['latency_ms']:6.1f} "
+            f"{before['complete']:5.0%} -> {after['complete']:4.0%}"
+        )
+    prompt_before = sum(by_set[baseline]["prompt_tokens_per_call"] for by_set in results.values())
+    prompt_after = sum(by_set[candidate]["prompt_tokens_per_call"] for by_set in results.values())
+    print(f"Prompt tokens {baseline} -> {candidate}: {1 - prompt_after / prompt_before:.0%} fewer")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"sets": [baseline, candidate], "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
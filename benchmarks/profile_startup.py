@@ -0,0 +1,156 @@
+"""
+Profile SentenSnap's cold start, each measurement in a fresh interpreter.
+
+By default this prints the slowest imports of the app module and a cProfile
+of its first request (first render, entering a key, the first quote):
+
+    python benchmarks/profile_startup.py
+    python benchmarks/profile_startup.py --top 40
+
+`--probe` prints a JSON time-to-first-render measurement instead; this is
+what the "startup" group of run_benchmarks.py records. Probe modes:
+
+- lazy: no warmup, so the first quote loads the Gemini SDK and frequency index
+- background: warming up in a thread from the first run (plain `streamlit run`);
+  the first quote is requested once it reports ready (`ready_ms` after the render)
+- warmed: `warmup()` runs before the first render, like a replica started by
+  `serve.py` that passed its health check (the warmup is reported separately)
+
+Everything runs against the fake backend with empty caches.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import cProfile
+import pstats
+import tempfile
+import threading
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+
+PROBE_MODES = ("lazy", "background", "warmed")
+
+
+def probe_env(mode):
+    env = dict(os.environ, SENTENSNAP_BACKEND="fake", SENTENSNAP_FAKE_LATENCY="0")
+    env["SENTENSNAP_CACHE_DIR"] = tempfile.mkdtemp(prefix="sentensnap-startup-")
+    env["SENTENSNAP_WARMUP"] = "1" if mode == "background" else "0"
+    return env
+
+
+def import_times():
+    """
+    Import the app module in a fresh interpreter and return [(module, depth, self_us, cumulative_us)].
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import streamlit_app"],
+        cwd=SRC_DIR, env=probe_env("lazy"), capture_output=True, text=True, check=True,
+    ).stderr
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_probe(mode):
+    """
+    Measure one cold start in a fresh interpreter and return its timings in milliseconds.
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--probe", mode],
+        cwd=REPO_ROOT, env=probe_env(mode), capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def profile_threads(profilers):
+    """
+    Profile every thread started from now on (AppTest runs the script in its own thread).
+    """
+    def start_profiler(*_):
+        profiler = cProfile.Profile()
+        profilers.append(profiler)
+        profiler.enable()  # Replaces this hook for the rest of the thread
+
+    threading.setprofile(start_profiler)
+
+
+def probe(mode, profilers=None):
+    sys.path.insert(0, SRC_DIR)
+    timings = {}
+    start = time.perf_counter()
+    import streamlit_app  # noqa: F401
+    timings["import_app_ms"] = (time.perf_counter() - start) * 1e3
+
+    from streamlit.testing.v1 import AppTest
+    from warmup import warmup
+
+    if mode == "warmed":
+        start = time.perf_counter()
+        warmup()
+        timings["warmup_ms"] = (time.perf_counter() - start) * 1e3
+
+    app = AppTest.from_file(os.path.join(SRC_DIR, "streamlit_app.py"), default_timeout=60)
+    if profilers is not None:
+        profile_threads(profilers)
+    start = time.perf_counter()
+    app.run()
+    timings["first_render_ms"] = (time.perf_counter() - start) * 1e3
+    timings["time_to_first_render_ms"] = timings["import_app_ms"] + timings["first_render_ms"]
+
+    if mode == "background":
+        from warmup import _status
+
+        while _status["state"] == "running":
+            time.sleep(0.005)
+        timings["ready_ms"] = (time.perf_counter() - start) * 1e3 - timings["first_render_ms"]
+
+    start = time.perf_counter()
+    app.sidebar.text_input[0].input("fake-key").run()
+    next(button for button in app.button if button.label == "Get a Random Quote Snapshot").click()
+    app.run()
+    timings["first_quote_ms"] = (time.perf_counter() - start) * 1e3
+    threading.setprofile(None)
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile SentenSnap's import time and first request.")
+    parser.add_argument("--probe", choices=PROBE_MODES, help="Print one JSON time-to-first-render measurement.")
+    parser.add_argument("--cprofile", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--top", type=int, default=20, help="Rows per table (default: 20).")
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        profilers = [] if args.cprofile else None
+        timings = probe(args.probe, profilers)
+        if profilers:
+            pstats.Stats(*profilers).sort_stats("cumulative").print_stats(args.top)
+        print(json.dumps(timings))
+        return
+
+    modules = import_times()
+    total = sum(cumulative for _, depth, _, cumulative in modules if depth == 0)
+    print(f"import streamlit_app: {total / 1e3:.0f} ms. Slowest imports (self time):")
+    for name, _, self_us, cumulative_us in sorted(modules, key=lambda module: -module[2])[:args.top]:
+        print(f"  {name:60s} {self_us / 1e3:7.1f} ms self {cumulative_us / 1e3:8.1f} ms cumulative")
+
+    print("\nFirst request (lazy mode), by cumulative time:")
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--probe", "lazy", "--cprofile", "--top", str(args.top)],
+        cwd=REPO_ROOT, env=probe_env("lazy"), check=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
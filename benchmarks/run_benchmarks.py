@@ -0,0 +1,304 @@
+"""
+Offline benchmark suite for SentenSnap.
+
+Everything runs against the deterministic FakeBackend, so no API key or
+network access is needed. Results are written as JSON so that runs from
+different commits can be compared:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only parse passage
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<older>.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# Keep benchmark caches away from the real ones; must be set before importing the app modules.
+os.environ["SENTENSNAP_CACHE_DIR"] = tempfile.mkdtemp(prefix="sentensnap-bench-")
+sys.path.insert(0, SRC_DIR)
+
+from backends import FakeBackend  # noqa: E402
+from build_dictionary import iter_kaikki, merge_entries, write_dictionary  # noqa: E402
+from definition_cache import DefinitionCache  # noqa: E402
+from local_dictionary import LocalDictionary  # noqa: E402
+from profile_startup import PROBE_MODES, run_probe  # noqa: E402
+from senten_snap import SentenSnap  # noqa: E402
+from text_pipeline import analyze_passage, tokenize  # noqa: E402
+from word_difficulty import get_difficulty_index  # noqa: E402
+
+SINGLE_TABLE = FakeBackend().reply_for('Provide a detailed definition for the word "ephemeral".', 1)
+MULTI_ROW_TABLE = FakeBackend().reply_for(
+    "Provide a detailed definition for each of the following words:\n"
+    + "\n".join(f"- word{i}" for i in range(15)),
+    1,
+)
+QUOTE = "We are what we repeatedly do; excellence, then, is not an act but a habit."
+EXCERPT = (
+    "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+    "foolishness, it was the epoch of belief, it was the epoch of incredulity, it was the season of Light, "
+    "it was the season of Darkness, it was the spring of hope, it was the winter of despair, we had "
+    "everything before us, we had nothing before us, we were all going direct to Heaven, we were all going "
+    "direct the other way — in short, the period was so far like the present period, that some of its "
+    "noisiest authorities insisted on its being received, for good or for evil, in the superlative degree "
+    "of comparison only."
+)
+
+
+def measure(fn, number=1000, repeat=5):
+    """
+    Time `fn` `number` times per round for `repeat` rounds and summarize per-call cost.
+    """
+    fn()  # Warm up lazy loads outside the timed region
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+    mean = statistics.mean(per_call)
+    return {
+        "mean_us": mean * 1e6,
+        "min_us": min(per_call) * 1e6,
+        "ops_per_sec": 1.0 / mean if mean else float("inf"),
+        "calls": number * repeat,
+    }
+
+
+def bench_parse():
+    snap = SentenSnap(cache=DefinitionCache(path=None))
+    return {
+        "single_row_table": measure(lambda: snap.parse_table_response(SINGLE_TABLE), number=5000),
+        "multi_row_table_15_words": measure(
+            lambda: snap.parse_table_response(MULTI_ROW_TABLE, key_field="Word"), number=2000
+        ),
+    }
+
+
+def bench_passage():
+    get_difficulty_index()  # Index load is measured separately by the startup benchmark
+    return {
+        "tokenize_excerpt": measure(lambda: tokenize(EXCERPT), number=2000),
+        "analyze_quote": measure(lambda: analyze_passage(QUOTE), number=500),
+        "analyze_excerpt": measure(lambda: analyze_passage(EXCERPT), number=200),
+    }
+
+
+def bench_cache():
+    path = os.path.join(os.environ["SENTENSNAP_CACHE_DIR"], "bench-definitions.sqlite3")
+    warm = SentenSnap(cache=DefinitionCache(path=path), model=FakeBackend())
+    warm.define_word("ephemeral")
+    disk_only = SentenSnap(cache=DefinitionCache(path=path, memory_size=0), model=FakeBackend())
+    return {
+        "define_word_memory_hit": measure(lambda: warm.define_word("ephemeral"), number=5000),
+        "define_word_disk_hit": measure(lambda: disk_only.define_word("ephemeral"), number=1000),
+        "define_word_miss_fake_backend": measure(
+            lambda: SentenSnap(cache=DefinitionCache(path=None), model=FakeBackend()).define_word("ephemeral"),
+            number=500,
+        ),
+    }
+
+
+def bench_generation():
+    snap = SentenSnap(cache=DefinitionCache(path=None), model=FakeBackend())
+    return {
+        "generate_random_book": measure(snap.generate_random_book, number=500),
+        "stream_random_book": measure(lambda: dict(snap.stream_random_book()), number=500),
+        "define_words_30_uncached": measure(
+            lambda: SentenSnap(cache=DefinitionCache(path=None), model=FakeBackend()).define_words(
+                [f"word{i}" for i in range(30)]
+            ),
+            number=100,
+        ),
+    }
+
+
+def bench_dictionary(words=50000):
+    """
+    Build a local dictionary from a synthetic kaikki.org dump and time loading and lookups.
+    """
+    from wordfreq import top_n_list
+
+    vocabulary = [word for word in top_n_list("en", words) if word.isalpha()]
+    directory = os.environ["SENTENSNAP_CACHE_DIR"]
+    dump_path = os.path.join(directory, "bench-kaikki.jsonl")
+    with open(dump_path, "w") as f:
+        for word in vocabulary:
+            f.write(json.dumps({
+                "word": word,
+                "pos": "noun",
+                "senses": [{
+                    "glosses": [f"A synthetic definition of {word} long enough to resemble a real gloss."],
+                    "examples": [{"text": f"This sentence uses {word}."}],
+                    "synonyms": [{"word": f"{word}-like"}, {"word": f"{word}ish"}],
+                }],
+            }) + "\n")
+
+    index_path = os.path.join(directory, "bench-dictionary.sqlite3")
+    start = time.perf_counter()
+    write_dictionary(merge_entries([iter_kaikki(dump_path)]), index_path)
+    build_seconds = time.perf_counter() - start
+
+    def cold_load():
+        dictionary = LocalDictionary(index_path)
+        dictionary.lookup("ephemeral")
+        dictionary.close()
+
+    dictionary = LocalDictionary(index_path)
+    hit_word = vocabulary[len(vocabulary) // 2]
+    local = SentenSnap(cache=DefinitionCache(path=None), model=FakeBackend(), providers=[dictionary])
+    return {
+        "entries": len(dictionary),
+        "index_mib": os.path.getsize(index_path) / 1024 / 1024,
+        "build_seconds": build_seconds,
+        "cold_load": measure(cold_load, number=50),
+        "lookup_hit": measure(lambda: dictionary.lookup(hit_word), number=20000),
+        "lookup_miss": measure(lambda: dictionary.lookup("zzzyzzx"), number=20000),
+        "define_word_local_hit": measure(lambda: local.define_word(hit_word), number=5000),
+    }
+
+
+def bench_session(latency=0.05):
+    """
+    Drive a full simulated session through Streamlit's AppTest harness.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["SENTENSNAP_BACKEND"] = "fake"
+    os.environ["SENTENSNAP_POOL_API_KEY"] = "fake-pool-key"  # Refill the pool like a deployment with a server key
+    os.environ["SENTENSNAP_FAKE_LATENCY"] = str(latency)
+    steps = {}
+
+    def step(name, action):
+        start = time.perf_counter()
+        action()
+        steps[name] = {"wall_ms": (time.perf_counter() - start) * 1e3}
+        if app.exception:
+            raise RuntimeError(f"{name}: {app.exception[0].message}")
+
+    def click(label):
+        next(button for button in app.button if button.label == label).click()
+        app.run()
+
+    def select_word(table, row):
+        # AppTest cannot select dataframe rows, so send the selection state the frontend would.
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        states = app._tree.get_widget_states()
+        states.widgets.append(WidgetState(
+            id=app.dataframe[table].proto.id,
+            string_value=json.dumps({"selection": {"rows": [row], "columns": []}}),
+        ))
+        app._run(states)
+
+    app = AppTest.from_file(os.path.join(SRC_DIR, "streamlit_app.py"), default_timeout=60)
+    step("first_render", app.run)
+    step("enter_api_key", lambda: app.sidebar.text_input[0].input("fake-key").run())
+    step("generate_quote", lambda: click("Get a Random Quote Snapshot"))
+    step("generate_book", lambda: click("Get a Random Book Snapshot"))
+    step("first_word_snapshot", lambda: select_word(0, 0))
+    step("repeat_word_snapshot", lambda: select_word(0, 0))
+    total = sum(result["wall_ms"] for result in steps.values())
+    return {"fake_latency_s": latency, "steps": steps, "total_wall_ms": total}
+
+
+def bench_startup(runs=3):
+    """
+    Time-to-first-render and first quote of a fresh process, per warmup mode (median of `runs`).
+    """
+    results = {}
+    for mode in PROBE_MODES:
+        samples = [run_probe(mode) for _ in range(runs)]
+        results[mode] = {name: statistics.median(sample[name] for sample in samples) for name in samples[0]}
+    return results
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "passage": bench_passage,
+    "cache": bench_cache,
+    "generation": bench_generation,
+    "dictionary": bench_dictionary,
+    "session": bench_session,
+    "startup": bench_startup,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results, prefix=""):
+    """
+    Flatten nested results into {"group.name.metric": value} for comparison.
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = flatten(json.load(f)["results"])
+    print(f"\nComparison against {baseline_path} (ratio = current / baseline):")
+    for name, value in sorted(flatten(current).items()):
+        if name in baseline and baseline[name] and name.endswith(("_us", "_ms")):
+            ratio = value / baseline[name]
+            flag = "  <-- slower" if ratio > 1.10 else ""
+            print(f"  {name:70s} {ratio:6.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline SentenSnap benchmark suite.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmark groups.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/<rev>.json).")
+    parser.add_argument("--compare", help="A previous results file to compare against.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", flush=True)
+        results[name] = BENCHMARKS[name]()
+
+    revision = git_revision()
+    report = {
+        "meta": {
+            "revision": revision,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import asyncio
+
+from client_registry import build_model, get_client_registry
+from scheduler import ScheduledModel
+from metrics import error_result, instrument, record_usage
+from prompts import format_word_list
+from senten_snap import DEFINE_BATCH_SIZE, SentenSnap
+
+
+class AsyncSentenSnap:
+    """
+    asyncio counterpart of SentenSnap built on `generate_content_async`.
+
+    Every coroutine returns the same parsed dictionaries (or `{"error": ...}`)
+    as the matching SentenSnap method, and shares its prompts, parser, local
+    dictionary and definition cache. It always uses the markdown table
+    prompts. At most `max_concurrency` Gemini calls run at once and each call
+    is abandoned after `timeout` seconds.
+
+    The async gRPC client is bound to the event loop it is first used on, so
+    it is not shared through the client registry; create one instance per
+    loop (e.g. per `asyncio.run`).
+    """
+
+    def __init__(self, gemini_api_key=None, cache=None, max_concurrency=4, timeout=30, model=None, prompts=None,
+                 language="en"):
+        self.snap = SentenSnap(cache=cache, prompts=prompts, language=language)
+        if model is not None:
+            self.model = model
+        else:
+            self.model = None
+            if gemini_api_key:
+                # A per-loop async client, throttled by the scheduler shared with the synchronous clients of this key.
+                self.model = ScheduledModel(
+                    build_model(gemini_api_key, use_async=True), get_client_registry().get_scheduler(gemini_api_key)
+                )
+        self.cache = self.snap.cache
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _generate(self, method, name, timeout=None, items=1, **values):
+        prompt, kwargs = self.snap.render_prompt(name, items, **values)
+        async with self._semaphore:
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(prompt, **kwargs), timeout=timeout or self.timeout
+            )
+        record_usage(method, response, self.snap.usage)
+        return response
+
+    async def _generate_table(self, method, name, task, timeout=None, **values):
+        if not self.model:
+            return {"error": "Gemini API key not configured"}
+        try:
+            response = await self._generate(method, name, timeout, **values)
+            return self.snap.parse_table_response(SentenSnap.response_text(response))
+        except asyncio.TimeoutError:
+            return error_result(task, TimeoutError("timed out"))
+        except Exception as e:
+            return error_result(task, e)
+
+    @instrument("define_word")
+    async def define_word(self, word, timeout=None):
+        local = self.snap.lookup_local(word)
+        if local is not None:
+            return local
+        cache_key = self.snap.cache_key(word)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        definition = await self._generate_table(
+            "define_word", "definition", "word definition retrieval", timeout, word=word
+        )
+        if "error" in definition:
+            return definition
+        return self.snap.store_definition(cache_key, definition)
+
+    @instrument("define_words")
+    async def define_words(self, words, batch_size=DEFINE_BATCH_SIZE, timeout=None):
+        """
+        Batch-define `words`, running every chunk's prompt concurrently.
+        """
+        results, pending = self.snap.split_cached(words)
+        if pending and not self.model:
+            for word in pending:
+                results[word] = {"error": "Gemini API key not configured"}
+            return self.snap.key_by_input(words, results)
+
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        replies = await asyncio.gather(
+            *(
+                self._generate(
+                    "define_words", "batch_definition", timeout, len(chunk), word_list=format_word_list(chunk)
+                )
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        missing = []
+        for chunk, reply in zip(chunks, replies):
+            raw_response = "" if isinstance(reply, BaseException) else SentenSnap.response_text(reply, default="")
+            parsed = self.snap.parse_table_response(raw_response, key_field="Word") if raw_response else {}
+            missing.extend(self.snap.apply_batch(chunk, parsed, results))
+
+        retried = await asyncio.gather(*(self.define_word(word, timeout) for word in missing))
+        results.update(zip(missing, retried))
+        return self.snap.key_by_input(words, results)
+
+    @instrument("generate_random_quote")
+    async def generate_random_quote(self, timeout=None):
+        return await self._generate_table("generate_random_quote", "quote", "random quote generation", timeout)
+
+    @instrument("generate_random_knowledge")
+    async def generate_random_knowledge(self, timeout=None):
+        return await self._generate_table(
+            "generate_random_knowledge", "knowledge", "random knowledge generation", timeout
+        )
+
+    @instrument("generate_random_book")
+    async def generate_random_book(self, timeout=None):
+        return await self._generate_table("generate_random_book", "book", "random book generation", timeout)
+
+    async def gather(self, *coroutines):
+        """
+        Run several of the coroutines above concurrently and return their results in order.
+        """
+        return await asyncio.gather(*coroutines)
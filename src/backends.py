@@ -0,0 +1,233 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+
+from results import field_name
+
+
+class ModelBackend:
+    """
+    Interface SentenSnap expects from its model.
+
+    `google.generativeai.GenerativeModel` satisfies it directly; anything else
+    passed to `SentenSnap(model=...)` must implement the same two methods and
+    return objects exposing `.text`, `.parts` and `.usage_metadata`.
+    """
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        raise NotImplementedError
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        raise NotImplementedError
+
+
+class FakeUsage:
+    __slots__ = ("prompt_token_count", "candidates_token_count", "total_token_count")
+
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class FakeResponse:
+    """
+    Minimal stand-in for a GenerateContentResponse (or one streamed chunk).
+    """
+
+    __slots__ = ("text", "parts", "usage_metadata")
+
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.parts = [text] if text else []
+        self.usage_metadata = usage
+
+
+def estimate_tokens(text):
+    # Gemini averages roughly four characters per token for English text.
+    return max(1, len(text) // 4)
+
+
+FAKE_QUOTES = [
+    ("The cave you fear to enter holds the treasure you seek.", "Joseph Campbell", "Book"),
+    ("Do not go gentle into that good night.", "Dylan Thomas", "Poem"),
+    ("We are what we repeatedly do; excellence, then, is not an act but a habit.", "Will Durant", "Book"),
+    ("Ever tried. Ever failed. No matter. Try again. Fail again. Fail better.", "Samuel Beckett", "Book"),
+]
+
+FAKE_KNOWLEDGE = [
+    ("Octopuses have three hearts and blue, copper-based blood.", "Marine biology"),
+    ("Honey found in ancient Egyptian tombs was still perfectly edible.", "Archaeology"),
+    ("A day on Venus is longer than its year.", "Astronomy"),
+]
+
+FAKE_BOOKS = [
+    (
+        "A Tale of Two Cities",
+        "Charles Dickens",
+        "A historical novel set in London and Paris before and during the French Revolution.",
+        "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age "
+        "of foolishness, it was the epoch of belief, it was the epoch of incredulity.",
+    ),
+    (
+        "Moby-Dick",
+        "Herman Melville",
+        "The obsessive quest of Captain Ahab for revenge on the white whale.",
+        "Call me Ishmael. Some years ago, never mind how long precisely, having little or no money in my "
+        "purse, and nothing particular to interest me on shore, I thought I would sail about a little.",
+    ),
+]
+
+
+class FakeBackend(ModelBackend):
+    """
+    Deterministic, offline model backend for benchmarks and local development.
+
+    Replies are canned tables chosen from the prompt's content type, so every
+    SentenSnap parser path is exercised; a `generation_config` asking for
+    "application/json" gets the same reply as JSON, and its `max_output_tokens`
+    truncates the reply. `latency` seconds plus `latency_per_token` for every
+    prompt and output token are spent per call (spread across chunks when
+    streaming), a `failure_rate` fraction of calls raise ResourceExhausted
+    like a quota error, and a fixed `seed` keeps runs reproducible.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0, stream_chunk_size=40, latency_per_token=0.0):
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.failure_rate = failure_rate
+        self.stream_chunk_size = stream_chunk_size
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            self.calls += 1
+            return self.calls, self._random.random()
+
+    @staticmethod
+    def _definition_fields(word):
+        return [
+            ("Definition", f"A fake definition of {word}."),
+            ("Part of Speech", "noun"),
+            ("Synonyms", f"{word}-like, {word}ish"),
+            ("Example Sentence", f"This sentence uses {word}."),
+        ]
+
+    def reply_for(self, prompt, call, as_json=False):
+        """
+        Return the canned reply text for `prompt`, as markdown or as JSON.
+        """
+        if "each of the following words" in prompt:
+            words = re.findall(r"^\s*- (.+)$", prompt, re.MULTILINE)
+            if as_json:
+                return json.dumps([
+                    {field_name(label): value for label, value in [("Word", word)] + self._definition_fields(word)}
+                    for word in words
+                ])
+            rows = "\n".join(
+                "| " + " | ".join([word] + [value for _, value in self._definition_fields(word)]) + " |"
+                for word in words
+            )
+            return (
+                "| Word | Definition | Part of Speech | Synonyms | Example Sentence |\n"
+                "|------|------------|----------------|----------|------------------|\n" + rows
+            )
+        if "definition for the word" in prompt:
+            fields = self._definition_fields(re.search(r'the word "([^"]*)"', prompt).group(1))
+        elif "quote" in prompt:
+            quote, author, source_type = FAKE_QUOTES[call % len(FAKE_QUOTES)]
+            fields = [
+                ("Quote", f'"{quote}"'),
+                ("Author", author),
+                ("Source Type", source_type),
+                ("Context", f"Canned reply #{call}."),
+            ]
+        elif "knowledge" in prompt:
+            knowledge, source = FAKE_KNOWLEDGE[call % len(FAKE_KNOWLEDGE)]
+            fields = [("Knowledge", f'"{knowledge}"'), ("Source", source), ("Context", f"Canned reply #{call}.")]
+        elif "book" in prompt:
+            title, author, intro, excerpt = FAKE_BOOKS[call % len(FAKE_BOOKS)]
+            fields = [("Book Title", title), ("Author", author), ("Intro", intro), ("Excerpt", excerpt)]
+        else:
+            fields = [("Reply", "Unrecognized prompt.")]
+        if as_json:
+            return json.dumps({field_name(label): value for label, value in fields})
+        rows = "\n".join(f"| {field} | {value} |" for field, value in fields)
+        return "| Field | Value |\n|-------|-------|\n" + rows
+
+    def _prepare(self, prompt, generation_config=None):
+        call, roll = self._next()
+        if roll < self.failure_rate:
+            from google.api_core import exceptions as google_exceptions
+
+            raise google_exceptions.ResourceExhausted("429 Resource has been exhausted (fake backend)")
+        generation_config = generation_config or {}
+        text = self.reply_for(prompt, call, as_json=generation_config.get("response_mime_type") == "application/json")
+        if generation_config.get("max_output_tokens"):
+            text = text[:generation_config["max_output_tokens"] * 4]  # See estimate_tokens
+        usage = FakeUsage(estimate_tokens(prompt), estimate_tokens(text))
+        return text, usage, self.latency + self.latency_per_token * usage.total_token_count
+
+    def _chunks(self, text, usage):
+        size = self.stream_chunk_size
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        for index, piece in enumerate(pieces):
+            yield FakeResponse(piece, usage if index == len(pieces) - 1 else None)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        text, usage, latency = self._prepare(prompt, kwargs.get("generation_config"))
+        if not stream:
+            time.sleep(latency)
+            return FakeResponse(text, usage)
+        chunks = list(self._chunks(text, usage))
+
+        def iterate():
+            for chunk in chunks:
+                if latency:
+                    time.sleep(latency / len(chunks))
+                yield chunk
+
+        return iterate()
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        text, usage, latency = self._prepare(prompt, kwargs.get("generation_config"))
+        if not stream:
+            await asyncio.sleep(latency)
+            return FakeResponse(text, usage)
+        chunks = list(self._chunks(text, usage))
+
+        async def iterate():
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield chunk
+
+        return iterate()
+
+
+_env_backend = None
+_env_backend_lock = threading.Lock()
+
+
+def backend_from_env():
+    """
+    Return the process-wide FakeBackend when SENTENSNAP_BACKEND=fake, otherwise
+    None (use Gemini). Latency, failure rate and seed come from
+    SENTENSNAP_FAKE_LATENCY, SENTENSNAP_FAKE_FAILURE_RATE and SENTENSNAP_FAKE_SEED.
+    """
+    global _env_backend
+    if os.environ.get("SENTENSNAP_BACKEND", "").lower() != "fake":
+        return None
+    with _env_backend_lock:
+        if _env_backend is None:
+            _env_backend = FakeBackend(
+                latency=float(os.environ.get("SENTENSNAP_FAKE_LATENCY", "0")),
+                failure_rate=float(os.environ.get("SENTENSNAP_FAKE_FAILURE_RATE", "0")),
+                seed=int(os.environ.get("SENTENSNAP_FAKE_SEED", "0")),
+            )
+        return _env_backend
@@ -0,0 +1,176 @@
+"""
+Compile a dictionary dump into the local index read by `local_dictionary.py`.
+
+Sources:
+- a Wiktionary extract in kaikki.org JSONL form (optionally gzipped), e.g.
+  https://kaikki.org/dictionary/English/kaikki.org-dictionary-English.jsonl
+- WordNet through nltk (`pip install nltk`, then `nltk.download("wordnet")`)
+
+    python src/build_dictionary.py --kaikki kaikki.org-dictionary-English.jsonl.gz
+    python src/build_dictionary.py --wordnet --min-zipf 2.0
+
+The first source with a definition for a word wins; later sources only
+fill in a missing example or synonyms.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import sqlite3
+import argparse
+
+from wordfreq import zipf_frequency
+
+from local_dictionary import DEFAULT_DICTIONARY_PATH, ENTRIES_SCHEMA, META_SCHEMA
+
+WORD_PATTERN = re.compile(r"^[a-z][a-z'-]*$")
+
+PART_OF_SPEECH = {
+    "adj": "adjective",
+    "adv": "adverb",
+    "prep": "preposition",
+    "conj": "conjunction",
+    "det": "determiner",
+    "pron": "pronoun",
+    "intj": "interjection",
+    "num": "numeral",
+    "n": "noun",
+    "v": "verb",
+    "a": "adjective",
+    "s": "adjective",
+    "r": "adverb",
+}
+
+# Wiktionary senses that only point at another entry ("plural of ...") are not definitions.
+SKIPPED_SENSE_TAGS = {"form-of", "alt-of", "abbreviation", "misspelling"}
+
+MAX_SYNONYMS = 3
+
+
+def open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_kaikki(path):
+    """
+    Yield (word, part of speech, definition, synonyms, example) from a kaikki.org JSONL dump.
+    """
+    with open_text(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("lang_code", "en") != "en":
+                continue
+            for sense in entry.get("senses", []):
+                glosses = sense.get("glosses")
+                if not glosses or SKIPPED_SENSE_TAGS & set(sense.get("tags", [])):
+                    continue
+                synonyms = [item["word"] for item in sense.get("synonyms", []) + entry.get("synonyms", [])
+                            if item.get("word")]
+                examples = [example["text"] for example in sense.get("examples", []) if example.get("text")]
+                pos = entry.get("pos", "")
+                example = examples[0] if examples else ""
+                yield entry["word"], PART_OF_SPEECH.get(pos, pos), glosses[-1], synonyms, example
+                break  # The first real sense is the primary meaning
+
+
+def iter_wordnet():
+    """
+    Yield the same tuples from nltk's WordNet corpus (most frequent synset first).
+    """
+    try:
+        from nltk.corpus import wordnet
+    except ImportError:
+        raise SystemExit("WordNet needs nltk: pip install nltk, then python -m nltk.downloader wordnet")
+    for lemma in wordnet.all_lemma_names():
+        synsets = wordnet.synsets(lemma)
+        if not synsets:
+            continue
+        synset = synsets[0]
+        synonyms = [name.replace("_", " ") for name in synset.lemma_names() if name.lower() != lemma]
+        examples = synset.examples()
+        yield lemma, PART_OF_SPEECH[synset.pos()], synset.definition(), synonyms, examples[0] if examples else ""
+
+
+def merge_entries(sources, min_zipf=0.0):
+    """
+    Merge source tuples into {word: [definition, part of speech, synonyms, example]}.
+    """
+    entries = {}
+    for source in sources:
+        for word, pos, definition, synonyms, example in source:
+            word = word.strip().lower()
+            if not WORD_PATTERN.match(word):
+                continue  # Multi-word expressions never appear in the word tables
+            entry = entries.get(word)
+            if entry is None:
+                if min_zipf and zipf_frequency(word, "en") < min_zipf:
+                    continue
+                entry = entries[word] = [definition.strip(), pos, [], ""]
+            for synonym in synonyms:
+                if len(entry[2]) < MAX_SYNONYMS and synonym.lower() != word and synonym not in entry[2]:
+                    entry[2].append(synonym)
+            if not entry[3] and example:
+                entry[3] = example.strip()
+    return entries
+
+
+def write_dictionary(entries, path, source=""):
+    """
+    Write the index to `path` atomically, so running processes keep their old copy.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(ENTRIES_SCHEMA)
+    conn.execute(META_SCHEMA)
+    conn.executemany(
+        "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+        (
+            (word, definition, pos or "N/A", ", ".join(synonyms) or "N/A", example or "N/A")
+            for word, (definition, pos, synonyms, example) in sorted(entries.items())
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        [
+            ("entries", str(len(entries))),
+            ("source", source),
+            ("language", "en"),
+            ("built_at", str(int(time.time()))),
+        ],
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build SentenSnap's offline dictionary index.")
+    parser.add_argument("--kaikki", nargs="*", default=[], help="kaikki.org JSONL dumps (.jsonl or .jsonl.gz).")
+    parser.add_argument("--wordnet", action="store_true", help="Also read WordNet through nltk.")
+    parser.add_argument("--min-zipf", type=float, default=1.5,
+                        help="Skip words rarer than this Zipf frequency; they are left to Gemini (0 keeps all).")
+    parser.add_argument("--output", default=DEFAULT_DICTIONARY_PATH, help="Index path (default: %(default)s).")
+    args = parser.parse_args(argv)
+    if not args.kaikki and not args.wordnet:
+        parser.error("give at least one source: --kaikki and/or --wordnet")
+
+    start = time.perf_counter()
+    sources = [iter_kaikki(path) for path in args.kaikki] + ([iter_wordnet()] if args.wordnet else [])
+    entries = merge_entries(sources, args.min_zipf)
+    names = [os.path.basename(path) for path in args.kaikki] + (["wordnet"] if args.wordnet else [])
+    write_dictionary(entries, args.output, source=",".join(names))
+    size = os.path.getsize(args.output) / 1024 / 1024
+    print(f"Indexed {len(entries)} words into {args.output} ({size:.1f} MiB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from scheduler import RequestScheduler, ScheduledModel
+
+MODEL_NAME = os.environ.get("SENTENSNAP_MODEL", 'gemini-pro')
+
+
+def key_fingerprint(api_key):
+    """
+    Return a stable, non-reversible identifier for an API key.
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def import_gemini():
+    """
+    Import the Gemini SDK. It takes over half a second, so it is deferred until
+    a model is first built (or `warmup.py` preloads it) rather than paid for by
+    every module that imports this one.
+    """
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+    from google.api_core import client_options as client_options_lib
+
+    return genai, glm, client_options_lib
+
+
+def build_model(api_key, use_async=False):
+    """
+    Build a GenerativeModel whose transport is bound to `api_key`.
+
+    `genai.configure` sets a process-global key, so two sessions configuring
+    different keys would race each other. Giving each model its own service
+    client keeps every key confined to the sessions that entered it.
+    """
+    genai, glm, client_options_lib = import_gemini()
+    options = client_options_lib.ClientOptions(api_key=api_key)
+    model = genai.GenerativeModel(MODEL_NAME)
+    if use_async:
+        model._async_client = glm.GenerativeServiceAsyncClient(client_options=options)
+    else:
+        model._client = glm.GenerativeServiceClient(client_options=options)
+    return model
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of configured Gemini models, one per API key.
+
+    Models (and their underlying gRPC channels) are reused across Streamlit
+    reruns and across sessions that share a key. Each model is wrapped in a
+    ScheduledModel whose RequestScheduler (rate limit, retries, circuit
+    breaker, request coalescing) is shared by every session using that key.
+    Entries are indexed by the key's SHA-256 fingerprint, dropped after
+    `idle_ttl` seconds without use, and capped at `max_clients` by
+    least-recent use.
+    """
+
+    def __init__(self, idle_ttl=30 * 60, max_clients=256):
+        self.idle_ttl = idle_ttl
+        self.max_clients = max_clients
+        self._entries = OrderedDict()  # fingerprint -> [scheduled model, last_used]
+        self._lock = threading.Lock()
+
+    def get_model(self, api_key):
+        fingerprint = key_fingerprint(api_key)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                entry = [ScheduledModel(build_model(api_key), RequestScheduler()), now]
+                self._entries[fingerprint] = entry
+                while len(self._entries) > self.max_clients:
+                    self._entries.popitem(last=False)
+            entry[1] = now
+            self._entries.move_to_end(fingerprint)
+            return entry[0]
+
+    def get_scheduler(self, api_key):
+        """
+        Return the request scheduler shared by every client of `api_key`.
+        """
+        return self.get_model(api_key).scheduler
+
+    def _evict_idle(self, now):
+        # Entries are kept in least-recently-used order, so stop at the first fresh one.
+        while self._entries:
+            fingerprint, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._entries[fingerprint]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_client_registry():
+    """
+    Return the process-wide client registry, creating it on first use.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from backends import backend_from_env
+from definition_cache import CACHE_DIR, open_sqlite
+from metrics import METRICS
+from senten_snap import SentenSnap
+from text_pipeline import analyze_passage
+
+DEFAULT_POOL_PATH = os.path.join(CACHE_DIR, "content_pool.sqlite3")
+
+# Content type -> (SentenSnap generator method, field holding the passage text)
+CONTENT_TYPES = {
+    "quote": ("generate_random_quote", "Quote"),
+    "knowledge": ("generate_random_knowledge", "Knowledge"),
+    "book": ("generate_random_book", "Excerpt"),
+}
+
+
+def content_hash(kind, result):
+    """
+    Hash the passage text of a parsed result, ignoring case, quotes and spacing.
+    """
+    text = result.get(CONTENT_TYPES[kind][1], "")
+    normalized = " ".join(text.strip("\"'“”").lower().split())
+    return hashlib.sha1(f"{kind}:{normalized}".encode("utf-8")).hexdigest()
+
+
+def pool_slot(kind, language="en"):
+    """
+    Name the pool slot (the `kind` column) holding `kind` passages in `language`.
+    """
+    return kind if language == "en" else f"{kind}:{language}"
+
+
+class ContentPool:
+    """
+    Persistent pool of ready-parsed passages for each content type.
+
+    Each pooled entry carries its precomputed passage analysis, so serving a
+    passage is a single pop. Each content type is pooled per language. If the
+    server has its own Gemini key (`api_key`), a background worker tops a slot
+    back up to `capacity` once it drops to `low_water`; users' own keys are
+    never spent on passages for other users. The last `max_seen` pooled
+    passages are remembered by content hash, so duplicates from the model are
+    discarded instead of pooled twice. The pool lives in SQLite and survives
+    restarts.
+    """
+
+    def __init__(self, path=DEFAULT_POOL_PATH, capacity=5, low_water=2, max_seen=20000, api_key=None):
+        self.path = path
+        self.api_key = api_key
+        self.capacity = capacity
+        self.low_water = low_water
+        self.max_seen = max_seen
+        self.stats = {"hits": 0, "misses": 0, "generated": 0, "duplicates": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._refilling = set()  # Pool slots with a running worker
+        self._marks = 0
+        # The pool is best-effort; without a usable file every passage is generated live.
+        self._conn = open_sqlite(
+            path,
+            "CREATE TABLE IF NOT EXISTS pool ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " kind TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " payload TEXT NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS seen (hash TEXT PRIMARY KEY, seen_at REAL NOT NULL)",
+        )
+
+    def size(self, kind, language="en"):
+        slot = pool_slot(kind, language)
+        with self._lock:
+            if self._conn is None:
+                return 0
+            try:
+                return self._conn.execute("SELECT COUNT(*) FROM pool WHERE kind = ?", (slot,)).fetchone()[0]
+            except sqlite3.Error:
+                return 0
+
+    def pop(self, kind, language="en"):
+        """
+        Remove and return the oldest pooled entry for `kind` in `language` as a
+        dictionary with "result" and "analysis" keys, or None if the pool is empty.
+        """
+        slot = pool_slot(kind, language)
+        row = None
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute("BEGIN IMMEDIATE")  # Other processes share the file
+                    try:
+                        row = self._conn.execute(
+                            "SELECT id, payload FROM pool WHERE kind = ? ORDER BY id LIMIT 1", (slot,)
+                        ).fetchone()
+                        if row is not None:
+                            self._conn.execute("DELETE FROM pool WHERE id = ?", (row[0],))
+                        self._conn.execute("COMMIT")
+                    except sqlite3.Error:
+                        self._conn.execute("ROLLBACK")
+                        raise
+                except sqlite3.Error:
+                    row = None  # Served live instead
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return json.loads(row[1])
+
+    def mark_seen(self, kind, result):
+        """
+        Record a passage as pooled. Returns False if it had been seen before
+        (True when the pool is unavailable and cannot tell).
+        """
+        with self._lock:
+            if self._conn is None:
+                return True
+            try:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen (hash, seen_at) VALUES (?, ?)",
+                    (content_hash(kind, result), time.time()),
+                )
+                self._marks += 1
+                if self._marks % 32 == 0:  # Amortize the trim over many inserts
+                    self._trim_seen()
+            except sqlite3.Error:
+                return True
+            return cursor.rowcount == 1
+
+    def add(self, kind, result, language="en"):
+        """
+        Analyze and pool a freshly generated result. Returns False for
+        duplicates, or if the pool is unavailable.
+        """
+        if self._conn is None:
+            return False
+        if not self.mark_seen(kind, result):
+            self.stats["duplicates"] += 1
+            return False
+        text = result[CONTENT_TYPES[kind][1]]
+        payload = {"result": result, "analysis": analyze_passage(text, lang=language).to_dict()}
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO pool (kind, hash, payload) VALUES (?, ?, ?)",
+                    (pool_slot(kind, language), content_hash(kind, result), json.dumps(payload)),
+                )
+            except sqlite3.Error:
+                return False
+        return True
+
+    def request_refill(self, kind, language="en"):
+        """
+        Start a background refill of `kind` in `language` if it is at or below
+        the low-water mark. Does nothing without a server-side API key or
+        when the pool is unavailable.
+        """
+        slot = pool_slot(kind, language)
+        if not self.api_key or self._conn is None or slot in self._refilling or self.size(kind, language) > self.low_water:
+            return
+        with self._lock:
+            if slot in self._refilling:
+                return
+            self._refilling.add(slot)
+        threading.Thread(
+            target=self._refill, args=(kind, language), name=f"sentensnap-pool-{slot}", daemon=True
+        ).start()
+
+    def _refill(self, kind, language):
+        senten_snap = SentenSnap(gemini_api_key=self.api_key, model=backend_from_env(), language=language)
+        generate = getattr(senten_snap, CONTENT_TYPES[kind][0])
+        field = CONTENT_TYPES[kind][1]
+        attempts = 0
+        try:
+            # Allow a few wasted attempts for duplicates and malformed replies, but never loop forever.
+            while self.size(kind, language) < self.capacity and attempts < self.capacity * 2:
+                attempts += 1
+                result = generate()
+                if "error" in result:
+                    self.stats["failures"] += 1
+                    return  # Leave quota/auth problems to the foreground request
+                if not result.get(field):
+                    self.stats["failures"] += 1
+                    continue
+                self.stats["generated"] += 1
+                self.add(kind, result, language)
+        finally:
+            with self._lock:
+                self._refilling.discard(pool_slot(kind, language))
+
+    def _trim_seen(self):
+        # Called with the lock held
+        self._conn.execute(
+            "DELETE FROM seen WHERE hash NOT IN (SELECT hash FROM seen ORDER BY seen_at DESC LIMIT ?)",
+            (self.max_seen,),
+        )
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_content_pool():
+    """
+    Return the process-wide content pool, creating it on first use.
+
+    Refills run on SENTENSNAP_POOL_API_KEY; without it the pool only serves
+    what is already stored.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ContentPool(api_key=os.environ.get("SENTENSNAP_POOL_API_KEY"))
+            METRICS.register_collector(
+                lambda: {f"sentensnap_content_pool_{name}": value for name, value in _default_pool.stats.items()}
+            )
+        return _default_pool
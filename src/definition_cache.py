@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from metrics import METRICS
+
+
+CACHE_DIR = os.environ.get("SENTENSNAP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sentensnap"))
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "definitions.sqlite3")
+
+
+def normalize_word(word):
+    """
+    Normalize a word for use as a cache key (strip whitespace and ignore case).
+    """
+    return word.strip().lower()
+
+
+def open_sqlite(path, *schema):
+    """
+    Open (creating it and its directory if needed) a WAL-mode SQLite file
+    shared across threads and processes, and run the `schema` statements.
+    Returns None if the file cannot be used: every store built on this treats
+    its disk tier as best-effort.
+    """
+    conn = None
+    try:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in schema:
+            conn.execute(statement)
+        return conn
+    except (OSError, sqlite3.Error):
+        if conn is not None:
+            conn.close()
+        return None
+
+
+class DefinitionCache:
+    """
+    Two-tier cache for parsed word definitions.
+
+    The first tier is an in-process LRU dictionary, the second an SQLite file
+    shared by every session and process on the host. Entries expire after
+    `ttl` seconds and each tier is bounded by its own entry count.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_size=1024, disk_size=100000, ttl=30 * 24 * 3600):
+        self.path = path
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (expires_at, definition)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if path:
+            # Without a usable file, only the in-process tier is used.
+            self._conn = open_sqlite(
+                path,
+                "CREATE TABLE IF NOT EXISTS definitions ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS definitions_accessed ON definitions (accessed_at)",
+            )
+
+    @staticmethod
+    def make_key(word, version, language="en"):
+        if language == "en":
+            return f"{version}:{normalize_word(word)}"  # Keeps entries cached before languages were added
+        return f"{version}:{language}:{normalize_word(word)}"
+
+    def get(self, key):
+        """
+        Return the cached definition for `key`, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return dict(entry[1])
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, expires_at FROM definitions WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and row[1] > now:
+                        self._conn.execute("UPDATE definitions SET accessed_at = ? WHERE key = ?", (now, key))
+                        definition = json.loads(row[0])
+                        self._remember(key, row[1], definition)
+                        self.stats["disk_hits"] += 1
+                        return dict(definition)
+                except sqlite3.Error:
+                    pass
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key, definition):
+        """
+        Store a parsed definition in both tiers.
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, dict(definition))
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO definitions (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(definition), expires_at, now),
+                    )
+                    self._writes += 1
+                    if self._writes % 64 == 0:  # Amortize the COUNT(*) over many writes
+                        self._evict_disk(now)
+                except sqlite3.Error:
+                    pass
+
+    def _remember(self, key, expires_at, definition):
+        self._memory[key] = (expires_at, definition)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        self._conn.execute("DELETE FROM definitions WHERE expires_at <= ?", (now,))
+        count = self._conn.execute("SELECT COUNT(*) FROM definitions").fetchone()[0]
+        if count > self.disk_size:
+            overflow = count - self.disk_size
+            self._conn.execute(
+                "DELETE FROM definitions WHERE key IN "
+                "(SELECT key FROM definitions ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self.stats["evictions"] += overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM definitions")
+                except sqlite3.Error:
+                    pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Return the process-wide definition cache, creating it on first use.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DefinitionCache()
+            METRICS.register_collector(
+                lambda: {f"sentensnap_definition_cache_{name}": value for name, value in _default_cache.stats.items()}
+            )
+        return _default_cache
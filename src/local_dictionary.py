@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import threading
+from urllib.parse import quote
+
+from definition_cache import CACHE_DIR, normalize_word
+from metrics import METRICS, logger
+
+DEFAULT_DICTIONARY_PATH = os.environ.get("SENTENSNAP_DICTIONARY", os.path.join(CACHE_DIR, "dictionary.sqlite3"))
+
+# The whole index is mapped into memory; a full English build is well under this.
+MMAP_SIZE = 512 * 1024 * 1024
+
+ENTRIES_SCHEMA = (
+    "CREATE TABLE entries ("
+    " word TEXT PRIMARY KEY,"
+    " definition TEXT NOT NULL,"
+    " part_of_speech TEXT NOT NULL,"
+    " synonyms TEXT NOT NULL,"
+    " example TEXT NOT NULL"
+    ") WITHOUT ROWID"
+)
+META_SCHEMA = "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+
+
+class LocalDictionary:
+    """
+    Read-only, memory-mapped dictionary index built by `build_dictionary.py`.
+
+    Entries live in a clustered (WITHOUT ROWID) SQLite table keyed by the
+    normalized word, so a lookup is a single B-tree probe over mapped pages.
+    The file is opened immutable: nothing is locked or journaled, and any
+    number of processes can share it. `lookup` returns the same label-keyed
+    dictionary as a Gemini definition, or None when the word is not indexed.
+    """
+
+    name = "local"
+
+    def __init__(self, path=DEFAULT_DICTIONARY_PATH):
+        self.path = path
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        uri = f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self.meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error:
+            self._conn.close()  # Not an index built by build_dictionary.py
+            raise
+        self.language = self.meta.get("language", "en")
+
+    def lookup(self, word):
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT definition, part_of_speech, synonyms, example FROM entries WHERE word = ?",
+                    (normalize_word(word),),
+                ).fetchone()
+            except sqlite3.Error:
+                row = None  # A damaged index answers nothing; Gemini still does
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return dict(zip(("Definition", "Part of Speech", "Synonyms", "Example Sentence"), row))
+
+    def __len__(self):
+        return int(self.meta.get("entries", 0))
+
+    def close(self):
+        self._conn.close()
+
+
+_default_dictionary = None
+_default_dictionary_failed = False
+_default_dictionary_lock = threading.Lock()
+
+
+def get_local_dictionary():
+    """
+    Return the process-wide local dictionary, or None if no index has been
+    built or the file is not a usable index.
+    """
+    global _default_dictionary, _default_dictionary_failed
+    with _default_dictionary_lock:
+        if _default_dictionary is None and not _default_dictionary_failed and os.path.exists(DEFAULT_DICTIONARY_PATH):
+            try:
+                _default_dictionary = LocalDictionary()
+            except (OSError, sqlite3.Error) as e:
+                # The index is best-effort; without it every lookup goes to Gemini.
+                logger.warning("Ignoring local dictionary %s: %s", DEFAULT_DICTIONARY_PATH, e)
+                _default_dictionary_failed = True
+                return None
+            METRICS.register_collector(lambda: {
+                f"sentensnap_local_dictionary_{name}": value for name, value in _default_dictionary.stats.items()
+            })
+        return _default_dictionary
+
+
+def default_providers():
+    """
+    Return the local definition providers SentenSnap tries before Gemini.
+    """
+    dictionary = get_local_dictionary()
+    return [dictionary] if dictionary is not None else []
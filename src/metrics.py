@@ -0,0 +1,434 @@
+import os
+import json
+import time
+import random
+import logging
+import functools
+import threading
+import inspect
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("sentensnap")
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds of the per-call token count histograms.
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+LOG_SAMPLE_RATE = float(os.environ.get("SENTENSNAP_LOG_SAMPLE_RATE", "0.1"))
+
+# Level of the `sentensnap` logger's stderr handler; sampled events are logged at INFO.
+LOG_LEVEL = os.environ.get("SENTENSNAP_LOG_LEVEL", "INFO").upper()
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket that contains it.
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, in-process counters and latency histograms.
+
+    Metrics are identified by a name plus keyword labels, e.g.
+    `inc("sentensnap_calls_total", method="define_word", outcome="ok")`.
+    Collectors registered with `register_collector` are polled at export
+    time for gauges owned by other components (cache and pool statistics).
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timed(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_collector(self, collector):
+        """
+        Register a callable returning {metric name: value} gauges to include in every export.
+        """
+        self._collectors.append(collector)
+
+    def _gauges(self):
+        gauges = {}
+        for collector in self._collectors:
+            try:
+                gauges.update(collector())
+            except Exception:
+                pass  # A broken collector must never take down the export
+        return gauges
+
+    def snapshot(self):
+        """
+        Return every metric as a JSON-serializable dictionary.
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "buckets": dict(zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.counts)),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {"timestamp": time.time(), "counters": counters, "histograms": histograms, "gauges": self._gauges()}
+
+    def to_prometheus(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        def render_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{str(value)}"' for key, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{render_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{render_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{render_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+        for name, value in sorted(self._gauges().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+METRICS = MetricsRegistry()
+
+
+def categorize_error(error):
+    """
+    Map an exception from the Gemini client (or the fake backend) to a coarse category.
+    """
+    name = type(error).__name__
+    message = str(error).lower()
+    if name == "RateLimitedError":
+        return "rate_limited"
+    if name == "CircuitOpenError":
+        return "circuit_open"
+    if name in ("ResourceExhausted", "TooManyRequests") or "429" in message or "quota" in message:
+        return "quota"
+    if name in ("PermissionDenied", "Unauthenticated") or "api key" in message or "api_key" in message:
+        return "auth"
+    if name in ("DeadlineExceeded", "TimeoutError") or "timed out" in message or "deadline" in message:
+        return "timeout"
+    if name in ("ServiceUnavailable", "InternalServerError", "BadGateway") or "503" in message or "500" in message:
+        return "unavailable"
+    if name in ("InvalidArgument", "BadRequest", "FailedPrecondition"):
+        return "invalid_request"
+    if name in ("StopCandidateException", "BlockedPromptException") or "safety" in message or "blocked" in message:
+        return "safety"
+    if name in ("ConnectionError", "ConnectionResetError", "RetryError"):
+        return "network"
+    return "unknown"
+
+
+def error_result(task, error):
+    """
+    Build the `{"error": ...}` dictionary SentenSnap returns, tagged with an
+    error category, and count it.
+    """
+    category = categorize_error(error)
+    METRICS.inc("sentensnap_errors_total", category=category)
+    return {"error": f"Error during {task}: {error}", "error_category": category}
+
+
+class TokenUsage:
+    """
+    Prompt and output token totals per method for one session (or client),
+    plus the most recent `max_recent` calls.
+    """
+
+    def __init__(self, max_recent=50):
+        self.totals = {}  # method -> [calls, prompt tokens, output tokens]
+        self.recent = deque(maxlen=max_recent)  # (method, prompt tokens, output tokens)
+        self._lock = threading.Lock()
+
+    def add(self, method, prompt_tokens, output_tokens):
+        with self._lock:
+            totals = self.totals.setdefault(method, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += output_tokens
+            self.recent.append((method, prompt_tokens, output_tokens))
+
+    @property
+    def prompt_tokens(self):
+        return sum(totals[1] for totals in self.totals.values())
+
+    @property
+    def output_tokens(self):
+        return sum(totals[2] for totals in self.totals.values())
+
+    def rows(self):
+        with self._lock:
+            return [
+                {"method": method, "calls": calls, "prompt_tokens": prompt, "output_tokens": output}
+                for method, (calls, prompt, output) in sorted(self.totals.items())
+            ]
+
+
+def record_usage(method, response, usage=None):
+    """
+    Count prompt and output tokens from a response's usage metadata, if
+    present, in the process metrics and in the `usage` accumulator.
+    """
+    metadata = getattr(response, "usage_metadata", None)
+    if not metadata:
+        return
+    prompt_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+    output_tokens = getattr(metadata, "candidates_token_count", 0) or 0
+    METRICS.inc("sentensnap_prompt_tokens_total", prompt_tokens, method=method)
+    METRICS.inc("sentensnap_output_tokens_total", output_tokens, method=method)
+    METRICS.observe("sentensnap_prompt_tokens", prompt_tokens, buckets=TOKEN_BUCKETS, method=method)
+    METRICS.observe("sentensnap_output_tokens", output_tokens, buckets=TOKEN_BUCKETS, method=method)
+    if usage is not None:
+        usage.add(method, prompt_tokens, output_tokens)
+
+
+def _outcome(result):
+    return "error" if isinstance(result, dict) and "error" in result else "ok"
+
+
+def instrument(method, metric="sentensnap_call_seconds"):
+    """
+    Decorate a function (or generator or coroutine function) to record its
+    latency and outcome under `metric{method=...}`. For generators the latency runs until
+    the generator is exhausted, and the time to its first item is recorded too.
+    """
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                outcome = "ok"
+                first = True
+                try:
+                    for item in fn(*args, **kwargs):
+                        if first:
+                            METRICS.observe(f"{metric[:-len('_seconds')]}_first_item_seconds",
+                                            time.perf_counter() - start, method=method)
+                            first = False
+                        if isinstance(item, tuple) and item and item[0] == "error":
+                            outcome = "error"
+                        yield item
+                finally:
+                    METRICS.observe(metric, time.perf_counter() - start, method=method)
+                    METRICS.inc("sentensnap_calls_total", method=method, outcome=outcome)
+            return generator_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def coroutine_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = _outcome(result)
+                    return result
+                finally:
+                    METRICS.observe(metric, time.perf_counter() - start, method=method)
+                    METRICS.inc("sentensnap_calls_total", method=method, outcome=outcome)
+            return coroutine_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = _outcome(result)
+                return result
+            finally:
+                METRICS.observe(metric, time.perf_counter() - start, method=method)
+                METRICS.inc("sentensnap_calls_total", method=method, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def log_sampled(event, rate=None, **fields):
+    """
+    Emit a structured JSON log line for `event`, keeping only a `rate` fraction of them.
+    """
+    if random.random() >= (LOG_SAMPLE_RATE if rate is None else rate):
+        return
+    logger.info(json.dumps({"event": event, **fields}, default=str, ensure_ascii=False))
+
+
+_readiness_checks = []
+
+
+def register_readiness_check(check):
+    """
+    Make `/ready` answer 503 while `check()` returns False (e.g. until warmup has finished).
+    """
+    _readiness_checks.append(check)
+
+
+def is_ready():
+    return all(check() for check in _readiness_checks)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") == "/ready":
+            ready = is_ready()
+            body = b"ready\n" if ready else b"warming up\n"
+            self.send_response(200 if ready else 503)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.rstrip("/") == "/metrics":
+            body, content_type = METRICS.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        elif self.path.rstrip("/") == "/metrics.json":
+            body, content_type = json.dumps(METRICS.snapshot()).encode("utf-8"), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes are too frequent to log
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def configure_logging():
+    """
+    Send the `sentensnap` logger to stderr at LOG_LEVEL, unless the host application already configured it.
+    """
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False  # Not printed twice if the root logger has handlers too
+
+
+def start_exporters():
+    """
+    Start the optional exporters configured through the environment, once per process:
+    SENTENSNAP_METRICS_PORT serves /metrics (Prometheus), /metrics.json and /ready over HTTP,
+    SENTENSNAP_METRICS_JSON names a file rewritten every SENTENSNAP_METRICS_INTERVAL seconds.
+    The `sentensnap` logger also gets a stderr handler at SENTENSNAP_LOG_LEVEL.
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    configure_logging()
+
+    port = os.environ.get("SENTENSNAP_METRICS_PORT")
+    if port:
+        server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="sentensnap-metrics", daemon=True).start()
+
+    path = os.environ.get("SENTENSNAP_METRICS_JSON")
+    if path:
+        interval = float(os.environ.get("SENTENSNAP_METRICS_INTERVAL", "60"))
+
+        def dump_forever():
+            while True:
+                time.sleep(interval)
+                try:
+                    with open(path + ".tmp", "w") as f:
+                        json.dump(METRICS.snapshot(), f)
+                    os.replace(path + ".tmp", path)
+                except OSError:
+                    logger.warning("Could not write metrics to %s", path)
+
+        threading.Thread(target=dump_forever, name="sentensnap-metrics-json", daemon=True).start()
@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from senten_snap import DEFINE_BATCH_SIZE
+
+# Upper bound on background Gemini calls across every session in the process.
+MAX_PREFETCH_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_PREFETCH_WORKERS, thread_name_prefix="sentensnap-prefetch")
+        return _executor
+
+
+class DefinitionPrefetcher:
+    """
+    Warm the definition cache in the background while the user is reading.
+
+    One prefetcher lives in each browser session. Every passage section
+    (quote, knowledge, book) runs at most one job at a time, which works
+    through its words hardest first in batches and stops as soon as a newer
+    passage replaces it or the session's word budget is spent.
+    """
+
+    def __init__(self, budget=150, batch_size=DEFINE_BATCH_SIZE):
+        self.budget = budget  # Words this session may still prefetch
+        self.batch_size = batch_size
+        self._jobs = {}  # section -> (passage_key, cancel event)
+        self._lock = threading.Lock()
+
+    def prefetch(self, senten_snap, section, passage_key, words):
+        """
+        Start prefetching `words` (ordered hardest first) for a section's passage.
+        Calling again with the same passage is a no-op; a new passage cancels the old job.
+        """
+        with self._lock:
+            job = self._jobs.get(section)
+            if job is not None:
+                if job[0] == passage_key:
+                    return
+                job[1].set()
+            cancelled = threading.Event()
+            self._jobs[section] = (passage_key, cancelled)
+        if words and self.budget > 0:
+            _get_executor().submit(self._run, senten_snap, list(words), cancelled)
+
+    def _run(self, senten_snap, words, cancelled):
+        for start in range(0, len(words), self.batch_size):
+            if cancelled.is_set():
+                return
+            with self._lock:
+                chunk = words[start:start + min(self.batch_size, self.budget)]
+                self.budget -= len(chunk)
+            if not chunk:
+                return
+            try:
+                senten_snap.define_words(chunk, batch_size=self.batch_size)
+            except Exception:
+                return  # Prefetching is best-effort; a click still fetches on demand
+
+    def cancel(self, section=None):
+        """
+        Cancel the job for `section`, or every job if no section is given.
+        """
+        with self._lock:
+            sections = [section] if section else list(self._jobs)
+            for name in sections:
+                job = self._jobs.pop(name, None)
+                if job is not None:
+                    job[1].set()
@@ -0,0 +1,231 @@
+import os
+
+# Prompt sets selectable with SENTENSNAP_PROMPTS. "legacy" reproduces the
+# original prompts verbatim for comparisons; "compact" is the default.
+PROMPT_SET = os.environ.get("SENTENSNAP_PROMPTS", "compact")
+
+# Appended to every prompt for a learner language other than English. Field
+# names stay in English so the table and JSON parsers read the reply as usual.
+LANGUAGE_INSTRUCTION = (
+    "\n\nWrite all content in {language}. Keep the field names (and table headers) in English exactly as given."
+)
+
+
+class PromptTemplate:
+    """
+    A versioned prompt for one content type and the generation settings that go with it.
+
+    `text` is a `str.format` template. `max_output_tokens` caps the reply
+    (plus `tokens_per_item` for every word of a batch prompt) and
+    `temperature` overrides the model default; both None leave the model's
+    defaults untouched. Bump `version` whenever the wording changes: cached
+    definitions are keyed by the version of the definition template in use
+    (`definition_json` and `definition` in JSON mode).
+    """
+
+    __slots__ = ("name", "version", "text", "max_output_tokens", "tokens_per_item", "temperature")
+
+    def __init__(self, name, version, text, max_output_tokens=None, tokens_per_item=0, temperature=None):
+        self.name = name
+        self.version = version
+        self.text = text
+        self.max_output_tokens = max_output_tokens
+        self.tokens_per_item = tokens_per_item
+        self.temperature = temperature
+
+    def render(self, language=None, **values):
+        """
+        Fill in the template; `language` (a display name such as "Spanish") asks for content in that language.
+        """
+        text = self.text.format(**values)
+        if language:
+            text += LANGUAGE_INSTRUCTION.format(language=language)
+        return text
+
+    def generation_config(self, items=1):
+        """
+        Return the `generation_config` for a prompt covering `items` words (empty when unset).
+        """
+        config = {}
+        if self.max_output_tokens is not None:
+            config["max_output_tokens"] = self.max_output_tokens + self.tokens_per_item * items
+        if self.temperature is not None:
+            config["temperature"] = self.temperature
+        return config
+
+    def __repr__(self):
+        return f"PromptTemplate({self.name!r}, {self.version!r})"
+
+
+def format_word_list(words):
+    return "\n".join(f"- {word}" for word in words)
+
+
+# JSON-mode prompts only describe the content; the response schema defines the format.
+JSON_PROMPTS = [
+    PromptTemplate(
+        "quote_json",
+        "v1",
+        "Generate a motivational or inspirational quote that is unique, diverse, and not overused, sourced from "
+        "speeches, books, movies, music lyrics, interviews or historical figures. Give the exact quote in "
+        "quotation marks, the full name of its author, the source type (e.g., Speech, Book, Movie, Music, "
+        "Historical Figure) and a brief context including the title of the work (if applicable) and the year.",
+    ),
+    PromptTemplate(
+        "knowledge_json",
+        "v1",
+        "Generate a random piece of knowledge or trivia that is unique and interesting, drawn from scientific "
+        "facts, historical events, cultural information or general trivia. Give the knowledge in quotation "
+        "marks, its source, and a brief context or background.",
+    ),
+    PromptTemplate(
+        "book_json",
+        "v1",
+        "Generate a random book. Give its title, the full name of its author, a brief introduction and overview "
+        "of the book, and an excerpt or famous piece of text from the book.",
+    ),
+    PromptTemplate(
+        "definition_json",
+        "v1",
+        'Provide a detailed definition for the word "{word}": a brief and detailed definition, its part of '
+        "speech (e.g., noun, verb), three comma-separated synonyms and an example sentence.",
+    ),
+    PromptTemplate(
+        "batch_definition_json",
+        "v1",
+        "Provide a detailed definition for each of the following words:\n"
+        "{word_list}\n"
+        "For each word give the word itself, a brief and detailed definition, its part of speech, three "
+        "comma-separated synonyms and an example sentence.",
+    ),
+]
+
+LEGACY_PROMPTS = {template.name: template for template in JSON_PROMPTS + [
+    PromptTemplate("quote", "v1", """
+            Generate a motivational or inspirational quote that is unique, diverse, and not overused. The quote should be sourced from a variety of materials, including but not limited to speeches, books, movies, music lyrics, interviews, and statements by historical figures. Respond in a table format as follows:
+
+            | Field        | Value                                                                 |
+            |--------------|----------------------------------------------------------------------|
+            | Quote        | "The exact quote, enclosed in quotation marks."                      |
+            | Author       | The full name of the person who said or wrote the quote.             |
+            | Source Type  | The type of source (e.g., Speech, Book, Movie, Music, Historical Figure). |
+            | Context      | A brief explanation of where the quote comes from, including the title of the work (if applicable) and the year. |
+            """),
+    PromptTemplate("knowledge", "v1", """
+            Generate a random piece of knowledge or trivia that is unique and interesting. The knowledge should be sourced from a variety of materials, including but not limited to scientific facts, historical events, cultural information, and general trivia. Respond in a table format as follows:
+
+            | Field        | Value                                                                 |
+            |--------------|----------------------------------------------------------------------|
+            | Knowledge    | "The exact piece of knowledge or trivia, enclosed in quotation marks."|
+            | Source       | The source of the knowledge or trivia.                                |
+            | Context      | A brief explanation of the context or background of the knowledge.    |
+            """),
+    PromptTemplate("book", "v1", """
+            Genreate a random book and provide information of it in a table format as follows:
+
+            | Field        | Value                                                                |
+            |--------------|----------------------------------------------------------------------|
+            | Book Title   | The title of the book.                                               |
+            | Author       | The full name of the author.                                         |
+            | Intro        | A brief introduction and overview of the book.                       |
+            | Excerpt      | An excerpt or a famous piece of text of the book.                    |
+            """),
+    PromptTemplate("definition", "v1", """
+            Provide a detailed definition for the word "{word}". Respond in a table format as follows:
+
+            | Field           | Value                                                                 |
+            |------------------|----------------------------------------------------------------------|
+            | Definition       | A brief and detailed definition of the word.                        |
+            | Part of Speech   | The part of speech for the word (e.g., noun, verb).                 |
+            | Synonyms         | synonym1, synonym2, synonym3                                        |
+            | Example Sentence | A sentence demonstrating the usage of the word.                    |
+            """),
+    PromptTemplate("batch_definition", "v1", """
+            Provide a detailed definition for each of the following words:
+
+            {word_list}
+
+            Respond with a single table containing one row per word, in the same order, as follows:
+
+            | Word | Definition | Part of Speech | Synonyms | Example Sentence |
+            |------|------------|----------------|----------|------------------|
+            | the word | A brief and detailed definition of the word. | The part of speech for the word (e.g., noun, verb). | synonym1, synonym2, synonym3 | A sentence demonstrating the usage of the word. |
+            """),
+]}
+
+COMPACT_PROMPTS = {template.name: template for template in JSON_PROMPTS + [
+    PromptTemplate(
+        "quote",
+        "v2",
+        "Generate a motivational or inspirational quote that is unique, diverse and not overused, from speeches, "
+        "books, movies, music lyrics, interviews or historical figures. Reply with only this table:\n"
+        "| Field | Value |\n"
+        "|---|---|\n"
+        '| Quote | "exact quote" |\n'
+        "| Author | full name |\n"
+        "| Source Type | Speech, Book, Movie, Music or Historical Figure |\n"
+        "| Context | brief origin, with the work's title (if any) and year |",
+        max_output_tokens=256,
+    ),
+    PromptTemplate(
+        "knowledge",
+        "v2",
+        "Generate a unique, interesting piece of knowledge or trivia (science, history, culture or general "
+        "trivia). Reply with only this table:\n"
+        "| Field | Value |\n"
+        "|---|---|\n"
+        '| Knowledge | "the fact" |\n'
+        "| Source | its source |\n"
+        "| Context | brief background |",
+        max_output_tokens=256,
+    ),
+    PromptTemplate(
+        "book",
+        "v2",
+        "Pick a random book. Reply with only this table:\n"
+        "| Field | Value |\n"
+        "|---|---|\n"
+        "| Book Title | title |\n"
+        "| Author | full name |\n"
+        "| Intro | brief overview |\n"
+        "| Excerpt | a famous passage from the book |",
+        max_output_tokens=512,
+    ),
+    PromptTemplate(
+        "definition",
+        "v2",
+        'Give a definition for the word "{word}". Reply with only this table:\n'
+        "| Field | Value |\n"
+        "|---|---|\n"
+        "| Definition | brief, precise definition |\n"
+        "| Part of Speech | e.g. noun, verb |\n"
+        "| Synonyms | synonym1, synonym2, synonym3 |\n"
+        "| Example Sentence | a sentence using the word |",
+        max_output_tokens=192,
+        temperature=0.2,
+    ),
+    PromptTemplate(
+        "batch_definition",
+        "v2",
+        "Define each of the following words:\n"
+        "{word_list}\n"
+        "Reply with only one table, one row per word in the same order:\n"
+        "| Word | Definition | Part of Speech | Synonyms | Example Sentence |\n"
+        "|---|---|---|---|---|",
+        max_output_tokens=64,
+        tokens_per_item=96,
+        temperature=0.2,
+    ),
+]}
+
+PROMPT_SETS = {"legacy": LEGACY_PROMPTS, "compact": COMPACT_PROMPTS}
+
+
+def get_prompts(name=None):
+    """
+    Return the prompt templates of set `name` (default: SENTENSNAP_PROMPTS, else "compact").
+    """
+    name = name or PROMPT_SET
+    if name not in PROMPT_SETS:
+        raise ValueError(f"Unknown prompt set {name!r}; expected one of {sorted(PROMPT_SETS)}")
+    return PROMPT_SETS[name]
@@ -0,0 +1,110 @@
+import json
+
+
+def field_name(label):
+    """
+    Map a display label such as "Part of Speech" to its JSON key ("part_of_speech").
+    """
+    return label.lower().replace(" ", "_")
+
+
+class StructuredResult:
+    """
+    Base class for typed results parsed from Gemini's JSON output mode.
+
+    Subclasses list their display labels in LABELS; each label is stored in
+    a `__slots__` attribute named by `field_name` and doubles as the JSON key
+    requested through `response_schema`. `to_dict()` returns the same
+    label-keyed dictionary the markdown table parser produces, so callers do
+    not care which mode produced a result.
+    """
+
+    __slots__ = ()
+    LABELS = ()
+
+    def __init__(self, **values):
+        for label in self.LABELS:
+            setattr(self, field_name(label), values.get(field_name(label), ""))
+
+    @classmethod
+    def schema(cls):
+        """
+        Return the `response_schema` for one result object.
+        """
+        keys = [field_name(label) for label in cls.LABELS]
+        return {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key in keys},
+            "required": keys,
+        }
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Validate a decoded JSON object; raises ValueError if it is not a complete result.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object for {cls.__name__}, got {type(data).__name__}")
+        values = {}
+        for label in cls.LABELS:
+            value = data.get(field_name(label))
+            if isinstance(value, list):
+                value = ", ".join(str(item) for item in value)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"{cls.__name__} is missing '{field_name(label)}'")
+            values[field_name(label)] = value.strip()
+        return cls(**values)
+
+    @classmethod
+    def from_json(cls, text):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON for {cls.__name__}: {e}") from e
+        return cls.from_data(data)
+
+    def to_dict(self):
+        return {label: getattr(self, field_name(label)) for label in self.LABELS}
+
+    def __repr__(self):
+        values = ", ".join(f"{field_name(label)}={getattr(self, field_name(label))!r}" for label in self.LABELS)
+        return f"{type(self).__name__}({values})"
+
+
+class Definition(StructuredResult):
+    __slots__ = ("definition", "part_of_speech", "synonyms", "example_sentence")
+    LABELS = ("Definition", "Part of Speech", "Synonyms", "Example Sentence")
+
+
+class WordDefinition(StructuredResult):
+    """
+    One row of a batch definition reply.
+    """
+
+    __slots__ = ("word", "definition", "part_of_speech", "synonyms", "example_sentence")
+    LABELS = ("Word",) + Definition.LABELS
+
+    def definition_result(self):
+        return Definition(**{field_name(label): getattr(self, field_name(label)) for label in Definition.LABELS})
+
+
+class Quote(StructuredResult):
+    __slots__ = ("quote", "author", "source_type", "context")
+    LABELS = ("Quote", "Author", "Source Type", "Context")
+
+
+class Knowledge(StructuredResult):
+    __slots__ = ("knowledge", "source", "context")
+    LABELS = ("Knowledge", "Source", "Context")
+
+
+class Book(StructuredResult):
+    __slots__ = ("book_title", "author", "intro", "excerpt")
+    LABELS = ("Book Title", "Author", "Intro", "Excerpt")
+
+
+def batch_schema():
+    """
+    Return the `response_schema` for a batch definition reply (a list of WordDefinition).
+    """
+    return {"type": "array", "items": WordDefinition.schema()}
@@ -0,0 +1,286 @@
+import os
+import time
+import random
+import asyncio
+import threading
+
+from metrics import METRICS, categorize_error
+
+# Error categories (see metrics.categorize_error) worth retrying.
+RETRYABLE_CATEGORIES = frozenset({"quota", "unavailable", "timeout", "network"})
+
+# Errors Gemini itself answered with: not retried, but proof that the service is reachable.
+ANSWERED_CATEGORIES = frozenset({"invalid_request", "safety", "auth"})
+
+
+class RateLimitedError(Exception):
+    """
+    Raised when a request cannot get a rate-limit token within its wait budget.
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without calling Gemini while the circuit breaker is open.
+    """
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: `rate` requests per second with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """
+        Take a token if one is available; otherwise return the seconds until one is.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, max_wait):
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitedError("Local rate limit exceeded; try again in a moment")
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait):
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitedError("Local rate limit exceeded; try again in a moment")
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Stop calling Gemini after `failure_threshold` consecutive retryable failures.
+
+    While open, calls fail fast for `reset_timeout` seconds; then one trial
+    call is let through (half-open) and its outcome closes or re-opens the
+    circuit. Every trial must end in `record_success`, `record_failure` or
+    `abort_trial`, or the circuit stays half-open.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Gemini is failing repeatedly; requests are paused briefly")
+                self.state = "half-open"
+                METRICS.inc("sentensnap_circuit_transitions_total", state="half-open")
+            elif self.state == "half-open":
+                raise CircuitOpenError("Gemini is failing repeatedly; waiting for a trial request")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                METRICS.inc("sentensnap_circuit_transitions_total", state="closed")
+            self.state = "closed"
+            self._failures = 0
+
+    def abort_trial(self):
+        """
+        Re-open a half-open circuit whose trial call ended without a verdict on Gemini's health.
+        """
+        with self._lock:
+            if self.state == "half-open":
+                METRICS.inc("sentensnap_circuit_transitions_total", state="open")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half-open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    METRICS.inc("sentensnap_circuit_transitions_total", state="open")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: callers that arrive while a call with
+    the same key is in flight wait for it and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+        if not leader:
+            METRICS.inc("sentensnap_coalesced_requests_total")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class RequestScheduler:
+    """
+    Everything between SentenSnap and one API key's Gemini model: a token-bucket
+    rate limiter, jittered exponential backoff for retryable errors, a circuit
+    breaker, and single-flight coalescing of identical non-streaming requests.
+    """
+
+    def __init__(self, rate=None, burst=None, max_attempts=4, base_delay=0.5, max_delay=8.0, max_wait=30.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        rate = rate if rate is not None else float(os.environ.get("SENTENSNAP_RATE_LIMIT", "1.0"))
+        burst = burst if burst is not None else int(os.environ.get("SENTENSNAP_RATE_BURST", "5"))
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.flights = SingleFlight()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+
+    def backoff(self, attempt):
+        # "Full jitter": a uniform delay up to the exponential cap spreads out synchronized retries.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _should_retry(self, error, attempt):
+        category = categorize_error(error)
+        if category in ANSWERED_CATEGORIES:
+            self.breaker.record_success()
+            return False
+        if category not in RETRYABLE_CATEGORIES:
+            self.breaker.abort_trial()
+            return False
+        self.breaker.record_failure()
+        if attempt + 1 >= self.max_attempts:
+            return False
+        METRICS.inc("sentensnap_retries_total", category=category)
+        return True
+
+    def call(self, fn, key=None):
+        """
+        Run `fn()` under the scheduler's policies. Calls sharing a non-None `key`
+        while one of them is in flight are coalesced into a single request.
+        """
+        if key is None:
+            return self._call_with_retries(fn)
+        return self.flights.do(key, lambda: self._call_with_retries(fn))
+
+    def _call_with_retries(self, fn):
+        attempt = 0
+        while True:
+            # Take the token first, so a rate-limited call never holds the half-open trial.
+            self.bucket.acquire(self.max_wait)
+            self.breaker.before_call()
+            try:
+                result = fn()
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.abort_trial()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, fn):
+        """
+        Async counterpart of `call` (without coalescing); `fn()` returns an awaitable.
+        """
+        attempt = 0
+        while True:
+            await self.bucket.acquire_async(self.max_wait)
+            self.breaker.before_call()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException:  # e.g. asyncio.CancelledError from a timeout
+                self.breaker.abort_trial()
+                raise
+            self.breaker.record_success()
+            return result
+
+
+class ScheduledModel:
+    """
+    Wrap a model backend so every request goes through a RequestScheduler.
+
+    Non-streaming requests given a `coalesce_key` are coalesced with concurrent
+    requests of the same key; callers only pass one for deterministic requests
+    (definitions), never for random passages, which must stay distinct.
+    Streaming requests are rate limited and retried only while the stream is
+    being opened, since a partially consumed stream cannot be replayed.
+    """
+
+    def __init__(self, model, scheduler):
+        self.model = model
+        self.scheduler = scheduler
+
+    def generate_content(self, prompt, stream=False, coalesce_key=None, **kwargs):
+        call = lambda: self.model.generate_content(prompt, stream=stream, **kwargs)  # noqa: E731
+        return self.scheduler.call(call, key=None if stream else coalesce_key)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        return await self.scheduler.call_async(
+            lambda: self.model.generate_content_async(prompt, stream=stream, **kwargs)
+        )
@@ -1,108 +1,440 @@
-import google.generativeai as genai
+import os
+import json
+import weakref
 
+from client_registry import get_client_registry
+from scheduler import ScheduledModel
+from definition_cache import DefinitionCache, get_default_cache
+from local_dictionary import default_providers
+from metrics import METRICS, TokenUsage, categorize_error, error_result, instrument, record_usage
+from prompts import format_word_list, get_prompts
+from results import Book, Definition, Knowledge, Quote, WordDefinition, batch_schema
+from word_difficulty import LANGUAGES
+
+# Number of words packed into a single batch definition prompt. Each row costs
+# roughly 60-80 output tokens, so this keeps a reply well under the output limit.
+DEFINE_BATCH_SIZE = 15
+
+DEFINITION_FIELDS = Definition.LABELS
+
+# "table" asks for markdown tables, "json" uses Gemini's structured output
+# (response_schema), which needs a model that supports it such as gemini-1.5-flash.
+OUTPUT_MODE = os.environ.get("SENTENSNAP_OUTPUT_MODE", "table")
+
+# Models that rejected JSON mode; they use the markdown prompts from then on.
+_json_unsupported = weakref.WeakSet()
+
+# An invalid-request error mentioning one of these rejects JSON mode itself,
+# not just the request at hand.
+JSON_MODE_ERRORS = ("response_mime_type", "response_schema", "json mode")
+
+
+def json_generation_config(schema, config=None):
+    return dict(config or {}, response_mime_type="application/json", response_schema=schema)
 
 class SentenSnap:
-    def __init__(self, gemini_api_key=None):
-        if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, gemini_api_key=None, cache=None, model=None, output_mode=None, providers=None,
+                 prompts=None, usage=None, language="en"):
+        """
+        `model` overrides the Gemini model with any backend implementing
+        `backends.ModelBackend` (e.g. the offline FakeBackend). `output_mode`
+        is "table" (markdown tables) or "json" (structured output with the
+        markdown parser as a fallback); it defaults to SENTENSNAP_OUTPUT_MODE.
+        `providers` are local definition sources with a `lookup(word)` method,
+        tried in order before Gemini; they default to the offline dictionary
+        index, if one has been built. `prompts` is a prompt set from
+        `prompts.py` (default: SENTENSNAP_PROMPTS) and `usage` a TokenUsage
+        accumulating this client's token counts, e.g. one per UI session.
+        `language` is the learner's language code (see `word_difficulty.LANGUAGES`):
+        content and definitions are generated in it, and only providers of
+        that language are consulted.
+        """
+        if language not in LANGUAGES:
+            raise ValueError(f"Unsupported language: {language!r}")
+        self.language = language
+        self.prompts = prompts or get_prompts()
+        self.usage = usage if usage is not None else TokenUsage()
+        providers = providers if providers is not None else default_providers()
+        self.providers = [provider for provider in providers if getattr(provider, "language", "en") == language]
+        self.output_mode = output_mode or OUTPUT_MODE
+        self.definition_version = self.prompts["definition"].version
+        if self.output_mode == "json":
+            # JSON-mode definitions may still come from the table template as a fallback, so both versions count
+            self.definition_version = f"json-{self.prompts['definition_json'].version}-{self.definition_version}"
+        if model is not None:
+            self.model = model
+        elif gemini_api_key:
+            self.model = get_client_registry().get_model(gemini_api_key)
         else:
             self.model = None
+        self.cache = cache if cache is not None else get_default_cache()
 
-    def parse_table_response(self, response):
+    @staticmethod
+    def response_text(response, default="No response generated"):
+        return response.text if response.parts else default
+
+    def parse_table_response(self, response, key_field=None):
         """
         Parse a table-like response into a dictionary.
+
+        If `key_field` is given, the response is read as a multi-row table whose
+        first row is the header, and the result maps the lowercased `key_field`
+        cell of every row to a dictionary of that row's remaining cells.
         """
         lines = response.strip().split("\n")
+        if key_field:
+            return self._parse_multi_row_table(lines, key_field)
         result = {}
         for line in lines:
-            if "|" in line:  # Process only table rows
-                parts = line.split("|")
-                if len(parts) >= 3:  # Ensure valid row with Field and Value
-                    field = parts[1].strip()
-                    value = parts[2].strip()
-                    result[field] = value
+            row = self.parse_table_row(line)
+            if row:
+                result[row[0]] = row[1]
         return result
 
-    def define_word(self, word):
-        if not self.model:
-            return {"error": "Gemini API key not configured"}
+    @staticmethod
+    def parse_table_row(line):
+        """
+        Parse a single `| Field | Value |` row into a (field, value) tuple.
+
+        Returns None for non-table lines, the `| Field | Value |` header and
+        separator rows. Pipes inside the value are kept rather than truncating it.
+        """
+        line = line.strip()
+        if line.count("|") < 2:  # Process only table rows with a Field and a Value
+            return None
+        if line.startswith("|"):
+            line = line[1:]
+        if line.endswith("|"):
+            line = line[:-1]
+        field, _, value = line.partition("|")
+        field = field.strip()
+        value = value.strip()
+        if not field or set(field) <= set("-: ") or (field == "Field" and value == "Value"):
+            return None
+        return field, value
+
+    def iter_table_rows(self, chunks):
+        """
+        Incrementally parse streamed response text, yielding each (field, value)
+        row as soon as its line is complete.
+        """
+        buffer = ""
+        for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                row = self.parse_table_row(line)
+                if row:
+                    yield row
+        row = self.parse_table_row(buffer)
+        if row:
+            yield row
+
+    def _parse_multi_row_table(self, lines, key_field):
+        header = None
+        result = {}
+        for line in lines:
+            line = line.strip()
+            if not line.startswith("|"):
+                continue
+            cells = [cell.strip() for cell in line.strip("|").split("|")]
+            if all(cell and set(cell) <= set("-: ") for cell in cells):
+                continue  # Separator row
+            if header is None:
+                header = cells
+                if key_field not in header:
+                    return {}
+                continue
+            if len(cells) != len(header):
+                continue  # Malformed row; the caller retries these words individually
+            row = dict(zip(header, cells))
+            key = row.pop(key_field).strip("*\"' ").lower()
+            if key:
+                result[key] = row
+        return result
+
+    def render_prompt(self, name, items=1, **values):
+        """
+        Render template `name` and return (prompt, generate_content keyword arguments).
+        """
+        template = self.prompts[name]
+        config = template.generation_config(items)
+        language = LANGUAGES[self.language] if self.language != "en" else None
+        return template.render(language, **values), ({"generation_config": config} if config else {})
+
+    def cache_key(self, word):
+        return DefinitionCache.make_key(word, self.definition_version, self.language)
+
+    def _record_usage(self, method, response):
+        record_usage(method, response, self.usage)
+
+    def _generate_content(self, prompt, coalesce=False, **kwargs):
+        """
+        Call the model. With `coalesce`, concurrent identical requests through a
+        ScheduledModel share one reply; only deterministic requests (definitions)
+        may ask for it, as random passages would all come back identical.
+        """
+        if coalesce and isinstance(self.model, ScheduledModel):
+            kwargs["coalesce_key"] = (prompt, repr(sorted(kwargs.items())))
+        return self.model.generate_content(prompt, **kwargs)
+
+    def _generate_json(self, method, name, schema, items=1, coalesce=False, **values):
+        """
+        Request structured output for template `name`. Returns the decoded JSON,
+        or None when the caller should fall back to the markdown prompt (the
+        model rejected JSON mode or the reply did not decode).
+        """
+        if self.output_mode != "json" or self.model in _json_unsupported:
+            return None
+        prompt, _ = self.render_prompt(name, items, **values)
+        # Output caps come from the matching table template
+        config = self.prompts[name[:-len("_json")]].generation_config(items)
         try:
-            prompt = f"""
-            Provide a detailed definition for the word "{word}". Respond in a table format as follows:
-
-            | Field           | Value                                                                 |
-            |------------------|----------------------------------------------------------------------|
-            | Definition       | A brief and detailed definition of the word.                        |
-            | Part of Speech   | The part of speech for the word (e.g., noun, verb).                 |
-            | Synonyms         | synonym1, synonym2, synonym3                                        |
-            | Example Sentence | A sentence demonstrating the usage of the word.                    |
-            """
-            response = self.model.generate_content(prompt)
-            raw_response = response.text if response.parts else "No response generated"
-            
-            return self.parse_table_response(raw_response)
+            response = self._generate_content(
+                prompt, coalesce, generation_config=json_generation_config(schema, config)
+            )
         except Exception as e:
-            return {"error": f"Error during word definition retrieval: {e}"}
+            if categorize_error(e) != "invalid_request":
+                raise
+            if any(marker in str(e).lower() for marker in JSON_MODE_ERRORS):
+                _json_unsupported.add(self.model)  # Shared by every session on this key
+                METRICS.inc("sentensnap_structured_fallbacks_total", reason="unsupported")
+            else:
+                METRICS.inc("sentensnap_structured_fallbacks_total", reason="invalid_request")  # This call only
+            return None
+        self._record_usage(method, response)
+        try:
+            return json.loads(self.response_text(response, default=""))
+        except ValueError:
+            METRICS.inc("sentensnap_structured_fallbacks_total", reason="invalid_json")
+            return None
 
-    def generate_random_quote(self):
+    def _generate_result(self, method, task, name, result_cls, coalesce=False, **values):
+        """
+        Generate one result from template `name` as a label-keyed dictionary,
+        through JSON mode when enabled and the markdown table prompt otherwise
+        (or as a fallback).
+        """
         if not self.model:
             return {"error": "Gemini API key not configured"}
         try:
-            prompt = """
-            Generate a motivational or inspirational quote that is unique, diverse, and not overused. The quote should be sourced from a variety of materials, including but not limited to speeches, books, movies, music lyrics, interviews, and statements by historical figures. Respond in a table format as follows:
-
-            | Field        | Value                                                                 |
-            |--------------|----------------------------------------------------------------------|
-            | Quote        | "The exact quote, enclosed in quotation marks."                      |
-            | Author       | The full name of the person who said or wrote the quote.             |
-            | Source Type  | The type of source (e.g., Speech, Book, Movie, Music, Historical Figure). |
-            | Context      | A brief explanation of where the quote comes from, including the title of the work (if applicable) and the year. |
-            """
-            response = self.model.generate_content(prompt)
-            raw_response = response.text if response.parts else "No response generated"
-            
-            return self.parse_table_response(raw_response)
+            data = self._generate_json(method, f"{name}_json", result_cls.schema(), coalesce=coalesce, **values)
+            if data is not None:
+                try:
+                    return result_cls.from_data(data).to_dict()
+                except ValueError:
+                    METRICS.inc("sentensnap_structured_fallbacks_total", reason="invalid_result")
+            prompt, kwargs = self.render_prompt(name, **values)
+            response = self._generate_content(prompt, coalesce, **kwargs)
+            self._record_usage(method, response)
+            return self.parse_table_response(self.response_text(response))
         except Exception as e:
-            return {"error": f"Error during random quote generation: {e}"}
+            return error_result(task, e)
+
+    def lookup_local(self, word):
+        """
+        Return the first local provider's definition of `word`, or None.
+        """
+        for provider in self.providers:
+            definition = provider.lookup(word)
+            if definition is not None:
+                METRICS.inc("sentensnap_definition_sources_total", source=provider.name)
+                return definition
+        return None
+
+    @instrument("define_word")
+    def define_word(self, word):
+        local = self.lookup_local(word)
+        if local is not None:
+            return local
+        cache_key = self.cache_key(word)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        definition = self._generate_result(
+            "define_word", "word definition retrieval", "definition", Definition, coalesce=True, word=word
+        )
+        if "error" in definition:
+            return definition
+        return self.store_definition(cache_key, definition)
+
+    def store_definition(self, cache_key, definition):
+        """
+        Cache a parsed definition under `cache_key` and return it. Empty or
+        malformed replies are returned but never cached.
+        """
+        if definition.get("Definition"):
+            self.cache.set(cache_key, definition)
+        return definition
+
+    @instrument("define_words")
+    def define_words(self, words, batch_size=DEFINE_BATCH_SIZE):
+        """
+        Define many words with as few Gemini calls as possible.
+
+        Words in a local dictionary or the cache are answered without a call,
+        the rest are packed into batch prompts of `batch_size` words. Words
+        missing or malformed in a batch reply are retried individually through
+        `define_word`.
+        Returns a dictionary mapping each input word to its parsed definition
+        (or an error dictionary).
+        """
+        results, pending = self.split_cached(words)
+        if pending and not self.model:
+            for word in pending:
+                results[word] = {"error": "Gemini API key not configured"}
+            return self.key_by_input(words, results)
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            try:
+                parsed = self._generate_batch(chunk)
+            except Exception as e:
+                error_result("batch word definition retrieval", e)  # Counted; the words are retried below
+                parsed = {}  # Every word in the chunk falls back to an individual request below
+            for word in self.apply_batch(chunk, parsed, results):
+                results[word] = self.define_word(word)
+        return self.key_by_input(words, results)
+
+    def _generate_batch(self, chunk):
+        word_list = format_word_list(chunk)
+        data = self._generate_json(
+            "define_words", "batch_definition_json", batch_schema(), len(chunk), coalesce=True, word_list=word_list
+        )
+        if isinstance(data, list):
+            return self.parse_batch_json(data)
+        prompt, kwargs = self.render_prompt("batch_definition", len(chunk), word_list=word_list)
+        response = self._generate_content(prompt, coalesce=True, **kwargs)
+        self._record_usage("define_words", response)
+        raw_response = self.response_text(response, default="")
+        return self.parse_table_response(raw_response, key_field="Word") if raw_response else {}
+
+    @staticmethod
+    def parse_batch_json(data):
+        """
+        Convert a decoded JSON batch reply into the same word -> row mapping as the
+        multi-row table parser, skipping invalid entries.
+        """
+        parsed = {}
+        for item in data:
+            try:
+                row = WordDefinition.from_data(item)
+            except ValueError:
+                continue  # Retried individually by the caller
+            parsed[row.word.strip("*\"' ").lower()] = row.definition_result().to_dict()
+        return parsed
+
+    def split_cached(self, words):
+        """
+        De-duplicate `words` and split them into locally known or cached results
+        and words still to define.
+        """
+        results = {}
+        pending = []
+        seen = set()
+        for word in words:
+            normalized = word.strip().lower()
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            cached = self.lookup_local(word)
+            if cached is None:
+                cached = self.cache.get(self.cache_key(word))
+            if cached is not None:
+                results[word] = cached
+            else:
+                pending.append(word)
+        return results, pending
+
+    @staticmethod
+    def key_by_input(words, results):
+        """
+        Return `results` (keyed by the first spelling of each word) keyed by
+        every input spelling, so "alpha" and "Alpha" both get the definition.
+        """
+        first = {}
+        for word in words:
+            normalized = word.strip().lower()
+            if normalized:
+                first.setdefault(normalized, word)
+        return {word: results[first[word.strip().lower()]] for word in words if word.strip()}
+
+    def apply_batch(self, chunk, parsed, results):
+        """
+        Store the parsed rows of a batch reply in `results` and return the words it failed to define.
+        """
+        missing = []
+        for word in chunk:
+            row = parsed.get(word.strip().lower())
+            if row and row.get("Definition"):
+                definition = {field: row.get(field, "N/A") for field in DEFINITION_FIELDS}
+                self.cache.set(self.cache_key(word), definition)
+                results[word] = definition
+            else:
+                missing.append(word)
+        return missing
+
+    @instrument("generate_random_quote")
+    def generate_random_quote(self):
+        return self._generate_result("generate_random_quote", "random quote generation", "quote", Quote)
     
+    @instrument("generate_random_knowledge")
     def generate_random_knowledge(self):
-        if not self.model:
-            return {"error": "Gemini API key not configured"}
-        try:
-            prompt = """
-            Generate a random piece of knowledge or trivia that is unique and interesting. The knowledge should be sourced from a variety of materials, including but not limited to scientific facts, historical events, cultural information, and general trivia. Respond in a table format as follows:
-
-            | Field        | Value                                                                 |
-            |--------------|----------------------------------------------------------------------|
-            | Knowledge    | "The exact piece of knowledge or trivia, enclosed in quotation marks."|
-            | Source       | The source of the knowledge or trivia.                                |
-            | Context      | A brief explanation of the context or background of the knowledge.    |
-            """
-            response = self.model.generate_content(prompt)
-            raw_response = response.text if response.parts else "No response generated"
-            
-            return self.parse_table_response(raw_response)
-        except Exception as e:
-            return {"error": f"Error during random knowledge generation: {e}"}
+        return self._generate_result("generate_random_knowledge", "random knowledge generation", "knowledge", Knowledge)
 
+    @instrument("generate_random_book")
     def generate_random_book(self):
+        return self._generate_result("generate_random_book", "random book generation", "book", Book)
+
+    def _stream_table(self, name, task, method):
         if not self.model:
-            return {"error": "Gemini API key not configured"}
+            yield "error", "Gemini API key not configured"
+            return
         try:
-            prompt = """
-            Genreate a random book and provide information of it in a table format as follows:
-
-            | Field        | Value                                                                |
-            |--------------|----------------------------------------------------------------------|
-            | Book Title   | The title of the book.                                               |
-            | Author       | The full name of the author.                                         |
-            | Intro        | A brief introduction and overview of the book.                       |
-            | Excerpt      | An excerpt or a famous piece of text of the book.                    |
-            """
-            response = self.model.generate_content(prompt)
-            raw_response = response.text if response.parts else "No response generated"
-            
-            return self.parse_table_response(raw_response)
+            prompt, kwargs = self.render_prompt(name)
+            response = self.model.generate_content(prompt, stream=True, **kwargs)
+            yield from self.iter_table_rows(self._chunk_texts(response, method))
         except Exception as e:
-            return {"error": f"Error during random book generation: {e}"}
\ No newline at end of file
+            yield from error_result(task, e).items()
+
+    def _chunk_texts(self, response, method):
+        last_chunk = None
+        for chunk in response:
+            last_chunk = chunk
+            yield self.response_text(chunk, default="")
+        if last_chunk is not None:
+            self._record_usage(method, last_chunk)  # Usage metadata on the final chunk covers the whole reply
+
+    @instrument("stream_random_quote")
+    def stream_random_quote(self):
+        """
+        Streaming variant of generate_random_quote; yields (field, value) rows as they arrive.
+        `dict()` of the stream equals the non-streaming result.
+        """
+        if self.output_mode == "json":
+            # Partial JSON cannot be shown, so structured mode delivers all fields at once.
+            yield from self.generate_random_quote().items()
+            return
+        yield from self._stream_table("quote", "random quote generation", "stream_random_quote")
+
+    @instrument("stream_random_knowledge")
+    def stream_random_knowledge(self):
+        """
+        Streaming variant of generate_random_knowledge; yields (field, value) rows as they arrive.
+        """
+        if self.output_mode == "json":
+            # Partial JSON cannot be shown, so structured mode delivers all fields at once.
+            yield from self.generate_random_knowledge().items()
+            return
+        yield from self._stream_table("knowledge", "random knowledge generation", "stream_random_knowledge")
+
+    @instrument("stream_random_book")
+    def stream_random_book(self):
+        """
+        Streaming variant of generate_random_book; yields (field, value) rows as they arrive.
+        """
+        if self.output_mode == "json":
+            # Partial JSON cannot be shown, so structured mode delivers all fields at once.
+            yield from self.generate_random_book().items()
+            return
+        yield from self._stream_table("book", "random book generation", "stream_random_book")
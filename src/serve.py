@@ -0,0 +1,35 @@
+"""
+Start the Streamlit app with its warmup and exporters already running.
+
+`streamlit run` only executes the app script when the first browser session
+connects, so warmup started from the script would wait for the first user,
+and the metrics port (with `/ready`) would not even be listening before then.
+This launcher starts both in the server process itself, then hands over to
+Streamlit; any extra arguments are passed on to `streamlit run`:
+
+    python src/serve.py
+    SENTENSNAP_METRICS_PORT=9464 python src/serve.py --server.port 8501
+
+A container health check can then poll http://localhost:$SENTENSNAP_METRICS_PORT/ready,
+which answers 503 until the warmup has finished.
+"""
+import os
+import sys
+
+from metrics import start_exporters
+from warmup import start_warmup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+
+def main(argv=None):
+    start_exporters()
+    start_warmup()  # The app script's own calls find both already running
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", APP_PATH] + list(sys.argv[1:] if argv is None else argv)
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from definition_cache import CACHE_DIR, open_sqlite
+from metrics import METRICS
+
+DEFAULT_STORE_PATH = os.path.join(CACHE_DIR, "shared_store.sqlite3")
+
+# Disk rows are re-stamped as recently used at most this often (seconds), to keep reads read-only.
+TOUCH_INTERVAL = 60
+
+
+class MemoryStore:
+    """
+    In-process shared store for JSON-serializable values, keyed by content hash.
+
+    Bounded by the total encoded size of its values (`max_bytes`) and evicted
+    least-recently-used first. Values are shared between sessions as-is, so
+    callers must not mutate what `get` returns.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Store `value` under `key`. `size` is its encoded size, measured if omitted.
+        """
+        if size is None:
+            size = len(json.dumps(value))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def snapshot(self):
+        return dict(self.stats, entries=len(self._entries), bytes=self._bytes)
+
+
+class SQLiteStore:
+    """
+    Shared store backed by an SQLite file, so every app replica on the host
+    shares passages and analyses.
+
+    Like DefinitionCache, reads go through an in-process MemoryStore first.
+    The file is bounded by the total encoded size of its values
+    (`max_bytes`); least-recently-used rows are evicted every few writes.
+    The file is best-effort: if it cannot be opened or written, the store
+    keeps working from its in-process tier.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=256 * 1024 * 1024, memory_bytes=16 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory = MemoryStore(memory_bytes)
+        self.stats = {"disk_hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = open_sqlite(
+            path,
+            "CREATE TABLE IF NOT EXISTS store ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed_at REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS store_accessed ON store (accessed_at)",
+        )
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        now = time.time()
+        with self._lock:
+            row = None
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, size, accessed_at FROM store WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and now - row[2] > TOUCH_INTERVAL:
+                        self._conn.execute("UPDATE store SET accessed_at = ? WHERE key = ?", (now, key))
+                except sqlite3.Error:
+                    pass
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+        value = json.loads(row[0])
+        self.memory.put(key, value, row[1])
+        return value
+
+    def put(self, key, value):
+        encoded = json.dumps(value)
+        self.memory.put(key, value, len(encoded))
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO store (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, encoded, len(encoded), time.time()),
+                )
+                self._writes += 1
+                if self._writes % 32 == 0:  # Amortize the SUM(size) over many writes
+                    self._evict()
+            except sqlite3.Error:
+                pass
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM store").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM store ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM store WHERE key = ?", evicted)
+        self.stats["evictions"] += len(evicted)
+
+    def snapshot(self):
+        entries = size = 0
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    entries, size = self._conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM store"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+        memory = self.memory.snapshot()
+        return dict(
+            self.stats, memory_hits=memory["hits"], memory_evictions=memory["evictions"], entries=entries, bytes=size
+        )
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """
+    Return the process-wide shared store, creating it on first use.
+
+    SENTENSNAP_STORE selects "memory" (default, per process) or "sqlite"
+    (shared by every replica on the host); SENTENSNAP_STORE_MAX_MB bounds it.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            max_bytes = int(float(os.environ.get("SENTENSNAP_STORE_MAX_MB", "256")) * 1024 * 1024)
+            if os.environ.get("SENTENSNAP_STORE", "memory").lower() == "sqlite":
+                _default_store = SQLiteStore(max_bytes=max_bytes)
+            else:
+                _default_store = MemoryStore(max_bytes)
+            METRICS.register_collector(
+                lambda: {f"sentensnap_shared_store_{name}": value for name, value in _default_store.snapshot().items()}
+            )
+        return _default_store
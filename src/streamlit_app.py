@@ -1,9 +1,16 @@
 import streamlit as st
 from senten_snap import SentenSnap
+from backends import backend_from_env
+from prefetch import DefinitionPrefetcher
 import sys
 import os
-import string  # Import the string module for handling punctuation
-import wordfreq  # For evaluating word difficulty based on frequency
+from word_difficulty import DEFAULT_THRESHOLDS, LANGUAGES, LEARNER_LEVELS
+from text_pipeline import PassageAnalysis, analyze_passage, get_memoized_analysis, memoize_analysis, passage_key
+from content_pool import content_hash, get_content_pool
+from shared_store import get_shared_store
+from metrics import METRICS, TokenUsage, instrument, log_sampled, start_exporters
+from warmup import start_warmup
+import time
 
 # Add the src directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
@@ -13,17 +20,49 @@ class SentenSnapUI:
         self.senten_snap = None
         self.quote_result = None  # To store the generated quote result
         self.definition_result = None  # To store the word snapshot result
+        self.prefetch_enabled = False  # Warm word snapshots in the background
+        self.difficulty_thresholds = DEFAULT_THRESHOLDS  # Zipf cut-offs for Easy/Medium/Hard
+        self.language = "en"  # Learner language for content, definitions and word ranking
+        self.show_metrics = False  # Render the performance debug panel
 
+    @instrument("render_sidebar", metric="sentensnap_ui_seconds")
     def render_sidebar(self):
         st.sidebar.header("Settings 🛠️")
         api_key = st.sidebar.text_input("Enter your Gemini API Key", type="password")
+        # A language's frequency index is only loaded once a learner picks it
+        self.language = st.sidebar.selectbox("Language", list(LANGUAGES), format_func=LANGUAGES.get)
         if api_key:
-            self.senten_snap = SentenSnap(gemini_api_key=api_key)
+            self.senten_snap = SentenSnap(
+                gemini_api_key=api_key,
+                model=backend_from_env(),
+                usage=st.session_state.setdefault("token_usage", TokenUsage()),  # Per-session token accounting
+                language=self.language,
+            )
+        learner_level = st.sidebar.selectbox(
+            "Learner level", list(LEARNER_LEVELS), index=list(LEARNER_LEVELS).index("Intermediate")
+        )
+        self.difficulty_thresholds = LEARNER_LEVELS[learner_level]
+        self.prefetch_enabled = st.sidebar.checkbox(
+            "Prefetch Hard/Medium word snapshots",
+            value=False,
+            help="Look up the harder words of each passage in the background while you read.",
+        )
+        if not self.prefetch_enabled and "prefetcher" in st.session_state:
+            st.session_state["prefetcher"].cancel()  # Unticking stops jobs that are still running
+        self.show_metrics = st.sidebar.checkbox("Show performance metrics", value=False)
+        self.metrics_container = st.sidebar.container()
         # Create expanders for each section in the sidebar
         self.quote_expander = st.sidebar.expander("Word 📸 from Quote", expanded=True)
         self.knowledge_expander = st.sidebar.expander("Word 📸 from Knowledge", expanded=True)
         self.book_expander = st.sidebar.expander("Word 📸 from Book", expanded=True)
-
+        # The word table fragments redraw only these slots when a word is selected
+        self.snapshot_slots = {
+            "quote": self.quote_expander.empty(),
+            "knowledge": self.knowledge_expander.empty(),
+            "book": self.book_expander.empty(),
+        }
+
+    @instrument("render_home_page", metric="sentensnap_ui_seconds")
     def render_home_page(self):
         st.title("🌟 Welcome to SentenSnap")
         st.markdown(
@@ -47,6 +86,7 @@ class SentenSnapUI:
             self.render_definition_section()
 
 
+    @instrument("render_quote_section", metric="sentensnap_ui_seconds")
     def render_quote_section(self):
         # Ensure session state initialization
         if "clicked_word" not in st.session_state:
@@ -58,22 +98,20 @@ class SentenSnapUI:
                 st.error("Please enter your Gemini API key in the sidebar.")
             else:
                 st.session_state["definition_expanded"] = False
-                st.session_state["quote_result"] = self.fetch_random_quote()
+                st.session_state["quote_ref"] = self.save_result("quote", self.fetch_random_quote())
 
-        if "quote_result" in st.session_state and st.session_state["quote_result"]:
+        quote_result = self.load_result("quote")
+        if quote_result:
             st.subheader("Random Quote Snapshot")
-            quote = st.session_state["quote_result"].get('Quote', 'No quote available.')
-            words = quote.split()
+            quote = quote_result.get('Quote', 'No quote available.')
+            analysis = self.analyze_passage(quote)
 
             # Section 1: Display Quote Words Prettily (Non-clickable)
-            st.markdown(
-                " ".join([f"<span style='font-size:18px; margin:4px;'>{word}</span>" for word in words]),
-                unsafe_allow_html=True,
-            )
+            st.markdown(analysis.html, unsafe_allow_html=True)
 
-            author = st.session_state["quote_result"].get("Author", "Unknown")
-            source_type = st.session_state["quote_result"].get("Source Type", "Unknown Source Type")
-            context = st.session_state["quote_result"].get("Context", "")
+            author = quote_result.get("Author", "Unknown")
+            source_type = quote_result.get("Source Type", "Unknown Source Type")
+            context = quote_result.get("Context", "")
             st.write(f"— {author}")
             st.write(f"Source Type: {source_type}")
             st.write(f"Context: {context}")
@@ -82,50 +120,11 @@ class SentenSnapUI:
             st.markdown("---")
             st.subheader("Words in Quote (Clickable for Snapshots)")
 
-            # Get unique words (remove punctuation and ignore case)
-            unique_words = set(
-                word.translate(str.maketrans("", "", string.punctuation)).lower()
-                for word in words
-            )
-            
-            # Compute difficulty and sort from hard to easy
-            words_with_difficulty = [
-                (word, self.get_word_difficulty(word), self.get_difficulty_rank(word))
-                for word in unique_words if word
-            ]
-            words_with_difficulty.sort(key=lambda x: x[2], reverse=True)  # Sort by difficulty rank (higher rank = harder)
-
-            # Create a Streamlit-based table layout
-            col1, col2, col3 = st.columns([2, 1, 1])
-            col1.markdown("**Word**")
-            col2.markdown("**Difficulty**")
-            col3.markdown("**Action**")
-
-            for word, difficulty, _ in words_with_difficulty:
-                col1, col2, col3 = st.columns([2, 1, 1])
-                col1.write(word)
-                col2.write(difficulty)
-                if col3.button("Get Snapshot", key=f"quote_word_{word}"):
-                    st.session_state["clicked_word"] = word  # Store clicked word in session state
-
-            # Display definition in the sidebar
-            if st.session_state["clicked_word"]:
-                word = st.session_state["clicked_word"]
-                with self.quote_expander:
-                    st.header("Word Snapshot")
-                    st.subheader(f"{word}")
-                    definition = self.fetch_definition(word)
-                    if definition:
-                        st.write(f"**Definition:** {definition.get('Definition', 'No definition available.')}")
-                        st.write(f"**Part of Speech:** {definition.get('Part of Speech', 'N/A')}")
-                        synonyms = definition.get('Synonyms', 'N/A')
-                        if synonyms != 'N/A':
-                            synonyms_list = synonyms.split(", ")
-                            st.write(f"**Synonyms:** {', '.join(synonyms_list)}")
-                        else:
-                            st.write(f"**Synonyms:** N/A")
-                        st.write(f"**Example Sentence:** {definition.get('Example Sentence', 'N/A')}")
+            # Unique words, sorted from hard to easy, computed once per passage
+            self.prefetch_words("quote", analysis)
+            self.render_word_table("quote", analysis, "clicked_word")
 
+    @instrument("render_knowledge_section", metric="sentensnap_ui_seconds")
     def render_knowledge_section(self):
         # Ensure session state initialization
         if "clicked_knowledge" not in st.session_state:
@@ -138,21 +137,19 @@ class SentenSnapUI:
                 st.error("Please enter your Gemini API key in the sidebar.")
             else:
                 st.session_state["definition_expanded"] = False
-                st.session_state["knowledge_result"] = self.fetch_random_knowledge()
+                st.session_state["knowledge_ref"] = self.save_result("knowledge", self.fetch_random_knowledge())
 
-        if "knowledge_result" in st.session_state and st.session_state["knowledge_result"]:
+        knowledge_result = self.load_result("knowledge")
+        if knowledge_result:
             st.subheader("Random Knowledge Snapshot")
-            knowledge = st.session_state["knowledge_result"].get('Knowledge', 'No knowledge available.')
-            words = knowledge.split()
+            knowledge = knowledge_result.get('Knowledge', 'No knowledge available.')
+            analysis = self.analyze_passage(knowledge)
 
             # Section 1: Display Knowledge Words Prettily (Non-clickable)
-            st.markdown(
-                " ".join([f"<span style='font-size:18px; margin:4px;'>{word}</span>" for word in words]),
-                unsafe_allow_html=True,
-            )
+            st.markdown(analysis.html, unsafe_allow_html=True)
 
-            source = st.session_state["knowledge_result"].get("Source", "Unknown")
-            context = st.session_state["knowledge_result"].get("Context", "")
+            source = knowledge_result.get("Source", "Unknown")
+            context = knowledge_result.get("Context", "")
             st.write(f"Source: {source}")
             st.write(f"Context: {context}")
 
@@ -160,50 +157,11 @@ class SentenSnapUI:
             st.markdown("---")
             st.subheader("Words in Knowledge (Clickable for Snapshots)")
 
-            # Get unique words (remove punctuation and ignore case)
-            unique_words = set(
-                word.translate(str.maketrans("", "", string.punctuation)).lower()
-                for word in words
-            )
-            
-            # Compute difficulty and sort from hard to easy
-            words_with_difficulty = [
-                (word, self.get_word_difficulty(word), self.get_difficulty_rank(word))
-                for word in unique_words if word
-            ]
-            words_with_difficulty.sort(key=lambda x: x[2], reverse=True)  # Sort by difficulty rank (higher rank = harder)
-
-            # Create a Streamlit-based table layout
-            col1, col2, col3 = st.columns([2, 1, 1])
-            col1.markdown("**Word**")
-            col2.markdown("**Difficulty**")
-            col3.markdown("**Action**")
-
-            for word, difficulty, _ in words_with_difficulty:
-                col1, col2, col3 = st.columns([2, 1, 1])
-                col1.write(word)
-                col2.write(difficulty)
-                if col3.button("Get Snapshot", key=f"knowledge_word_{word}"):
-                    st.session_state["clicked_knowledge"] = word  # Store clicked word in session state
-
-            # Display definition in the sidebar
-            if st.session_state["clicked_knowledge"]:
-                word = st.session_state["clicked_knowledge"]
-                with self.knowledge_expander:
-                    st.header("Word Snapshot 📸")
-                    st.subheader(f"{word}")
-                    definition = self.fetch_definition(word)
-                    if definition:
-                        st.write(f"**Definition:** {definition.get('Definition', 'No definition available.')}")
-                        st.write(f"**Part of Speech:** {definition.get('Part of Speech', 'N/A')}")
-                        synonyms = definition.get('Synonyms', 'N/A')
-                        if synonyms != 'N/A':
-                            synonyms_list = synonyms.split(", ")
-                            st.write(f"**Synonyms:** {', '.join(synonyms_list)}")
-                        else:
-                            st.write(f"**Synonyms:** N/A")
-                        st.write(f"**Example Sentence:** {definition.get('Example Sentence', 'N/A')}")
+            # Unique words, sorted from hard to easy, computed once per passage
+            self.prefetch_words("knowledge", analysis)
+            self.render_word_table("knowledge", analysis, "clicked_knowledge")
 
+    @instrument("render_book_section", metric="sentensnap_ui_seconds")
     def render_book_section(self):
         # Ensure session state initialization
         if "clicked_book" not in st.session_state:
@@ -215,15 +173,16 @@ class SentenSnapUI:
                 st.error("Please enter your Gemini API key in the sidebar.")
             else:
                 st.session_state["definition_expanded"] = False
-                st.session_state["book_result"] = self.fetch_random_book()
+                st.session_state["book_ref"] = self.save_result("book", self.fetch_random_book())
 
         # Section 1: Display Excerpt Words Prettily (Non-clickable)
-        if "book_result" in st.session_state and st.session_state["book_result"]:
+        book_result = self.load_result("book")
+        if book_result:
             st.subheader("Book Snapshot")
-            book_title = st.session_state["book_result"].get('Book Title', 'No title available.')
-            author = st.session_state["book_result"].get('Author', 'Unknown')
-            intro = st.session_state["book_result"].get('Intro', 'No intro available.')
-            excerpt = st.session_state["book_result"].get('Excerpt', 'No excerpt available.')
+            book_title = book_result.get('Book Title', 'No title available.')
+            author = book_result.get('Author', 'Unknown')
+            intro = book_result.get('Intro', 'No intro available.')
+            excerpt = book_result.get('Excerpt', 'No excerpt available.')
 
             st.write(f"**Title:** {book_title}")
             st.write(f"**Author:** {author}")
@@ -234,85 +193,112 @@ class SentenSnapUI:
             st.markdown("---")
             st.subheader("Words in Excerpt (Clickable for Snapshots)")
 
-            # Get unique words (remove punctuation and ignore case)
-            words = excerpt.split()
-            unique_words = set(
-                word.translate(str.maketrans("", "", string.punctuation)).lower()
-                for word in words
-            )
-            
-            # Compute difficulty and sort from hard to easy
-            words_with_difficulty = [
-                (word, self.get_word_difficulty(word), self.get_difficulty_rank(word))
-                for word in unique_words if word
-            ]
-            words_with_difficulty.sort(key=lambda x: x[2], reverse=True)  # Sort by difficulty rank (higher rank = harder)
-
-            # Create a Streamlit-based table layout
-            col1, col2, col3 = st.columns([2, 1, 1])
-            col1.markdown("**Word**")
-            col2.markdown("**Difficulty**")
-            col3.markdown("**Action**")
-
-            for word, difficulty, _ in words_with_difficulty:
-                col1, col2, col3 = st.columns([2, 1, 1])
-                col1.write(word)
-                col2.write(difficulty)
-                if col3.button("Get Snapshot", key=f"book_word_{word}"):
-                    st.session_state["clicked_book"] = word  # Store clicked word in session state
-
-            # Display definition in the sidebar
-            if st.session_state["clicked_book"]:
-                word = st.session_state["clicked_book"]
-                with self.book_expander:
-                    st.header("Word Snapshot 📸")
-                    st.subheader(f"{word}")
-                    definition = self.fetch_definition(word)
-                    if definition:
-                        st.write(f"**Definition:** {definition.get('Definition', 'No definition available.')}")
-                        st.write(f"**Part of Speech:** {definition.get('Part of Speech', 'N/A')}")
-                        synonyms = definition.get('Synonyms', 'N/A')
-                        if synonyms != 'N/A':
-                            synonyms_list = synonyms.split(", ")
-                            st.write(f"**Synonyms:** {', '.join(synonyms_list)}")
-                        else:
-                            st.write(f"**Synonyms:** N/A")
-                        st.write(f"**Example Sentence:** {definition.get('Example Sentence', 'N/A')}")
-
-    def get_word_difficulty(self, word):
+            # Unique words, sorted from hard to easy, computed once per excerpt
+            analysis = self.analyze_passage(excerpt)
+            self.prefetch_words("book", analysis)
+            self.render_word_table("book", analysis, "clicked_book")
+
+    @st.fragment
+    @instrument("render_word_table", metric="sentensnap_ui_seconds")
+    def render_word_table(self, section, analysis, clicked_key):
         """
-        Calculate the difficulty level of a word based on frequency.
-        Uses the 'wordfreq' package.
+        Render a passage's words as a selectable table and the selected word's
+        snapshot in the section's sidebar slot. Selecting a word reruns only this
+        fragment, so a click costs one snapshot rather than the whole page.
         """
-        try:
-            freq = wordfreq.word_frequency(word, 'en')  # Get word frequency in English
-            if freq > 0.001:
-                return "Easy"
-            elif 0.00001 < freq <= 0.001:
-                return "Medium"
-            else:
-                return "Hard"
-        except Exception as e:
-            return "Unknown"
+        event = st.dataframe(
+            analysis.word_table(),
+            key=f"{section}_words_{analysis.key}",  # A new passage starts with no selection
+            on_select="rerun",
+            selection_mode="single-row",
+            hide_index=True,
+            use_container_width=True,
+        )
+        if event.selection.rows:
+            st.session_state[clicked_key] = analysis.words_with_difficulty[event.selection.rows[0]][0]
+
+        # Display definition in the sidebar
+        word = st.session_state[clicked_key]
+        if not word:
+            return
+        with self.snapshot_slots[section].container():
+            st.header("Word Snapshot 📸")
+            st.subheader(f"{word}")
+            definition = self.fetch_definition(word)
+            if definition:
+                st.write(f"**Definition:** {definition.get('Definition', 'No definition available.')}")
+                st.write(f"**Part of Speech:** {definition.get('Part of Speech', 'N/A')}")
+                synonyms = definition.get('Synonyms', 'N/A')
+                if synonyms != 'N/A':
+                    synonyms_list = synonyms.split(", ")
+                    st.write(f"**Synonyms:** {', '.join(synonyms_list)}")
+                else:
+                    st.write(f"**Synonyms:** N/A")
+                st.write(f"**Example Sentence:** {definition.get('Example Sentence', 'N/A')}")
+
+    def analyze_passage(self, text):
+        """
+        Tokenize and rank a passage once, memoized in the shared store by
+        passage hash, so reruns (and other sessions showing the same passage)
+        do no text processing. The object itself is memoized per process, so
+        reruns also keep its built word table.
+        """
+        key = passage_key(text, self.difficulty_thresholds, self.language)
+        analysis = get_memoized_analysis(key)
+        if analysis is not None:
+            return analysis
+        data = get_shared_store().get(f"analysis:{key}")
+        if data is not None:
+            analysis = PassageAnalysis.from_dict(data)
+            memoize_analysis(analysis)
+            return analysis
+        analysis = analyze_passage(text, self.difficulty_thresholds, self.language)
+        self.remember_analysis(analysis)
+        return analysis
+
+    def remember_analysis(self, analysis):
+        memoize_analysis(analysis)
+        get_shared_store().put(f"analysis:{analysis.key}", analysis.to_dict())
+
+    def save_result(self, kind, result):
+        """
+        Put a generated result in the shared store and return the small
+        reference the session keeps instead of the result itself.
+        """
+        if not result:
+            return None
+        ref = f"{kind}:{content_hash(kind, result)}"
+        get_shared_store().put(ref, result)
+        return ref
 
-    def get_difficulty_rank(self, word):
+    def load_result(self, kind):
         """
-        Get a numeric difficulty rank for sorting (higher = harder).
+        Return the session's current result of `kind` from the shared store, or None.
         """
-        try:
-            freq = wordfreq.word_frequency(word, 'en')  # Get word frequency in English
-            if freq > 0.001:
-                return 1  # Easy
-            elif 0.00001 < freq <= 0.001:
-                return 2  # Medium
-            else:
-                return 3  # Hard
-        except Exception as e:
-            return 0  # Unknown or error
+        ref = st.session_state.get(f"{kind}_ref")
+        if not ref:
+            return None
+        result = get_shared_store().get(ref)
+        if result is None:
+            st.info("This snapshot has expired from the shared store; please generate a new one.")
+        return result
 
+    def prefetch_words(self, section, analysis):
+        """
+        Warm the definition cache for a passage's Hard and Medium words in the background.
+        """
+        if not self.prefetch_enabled or not self.senten_snap:
+            return
+        if "prefetcher" not in st.session_state:
+            st.session_state["prefetcher"] = DefinitionPrefetcher()
+        words = [word for word, _, rank in analysis.words_with_difficulty if rank >= 2]  # Already sorted hardest first
+        st.session_state["prefetcher"].prefetch(self.senten_snap, section, analysis.key, words)
+
+    @st.fragment
+    @instrument("render_definition_section", metric="sentensnap_ui_seconds")
     def render_definition_section(self):
         """
-        Render the word snapshot section.
+        Render the word snapshot section. Searching reruns only this tab.
         """
         word = st.text_input(
             "Enter a word to search for its definition:",
@@ -341,18 +327,99 @@ class SentenSnapUI:
                 st.write(f"**Synonyms:** N/A")
             st.write(f"**Example Sentence:** {self.definition_result.get('Example Sentence', 'N/A')}")
 
+    def render_debug_panel(self, rerun_seconds):
+        """
+        Render call latencies, token usage and error counts in the sidebar.
+        """
+        if not self.show_metrics:
+            return
+        snapshot = METRICS.snapshot()
+        with self.metrics_container.expander("Performance 📈", expanded=True):
+            st.write(f"**This rerun:** {rerun_seconds * 1000:.0f} ms")
+            st.table([
+                {
+                    "Call": histogram["labels"].get("method", histogram["name"]),
+                    "Count": histogram["count"],
+                    "Mean (ms)": round(histogram["sum"] / histogram["count"] * 1000, 1),
+                    "p95 ≤ (ms)": histogram["p95"] * 1000,
+                }
+                for histogram in snapshot["histograms"]
+                if histogram["count"] and histogram["name"].endswith("_seconds")
+                and histogram["name"] != "sentensnap_rerun_seconds"
+            ])
+            usage = st.session_state.get("token_usage")
+            if usage is not None and usage.totals:
+                st.write(f"**This session:** {usage.prompt_tokens} prompt + {usage.output_tokens} output tokens")
+                st.table(usage.rows())
+            counters = [
+                {"Metric": counter["name"], "Labels": ", ".join(f"{k}={v}" for k, v in counter["labels"].items()),
+                 "Value": counter["value"]}
+                for counter in snapshot["counters"]
+                if counter["name"] != "sentensnap_calls_total"
+            ]
+            if counters:
+                st.table(counters)
+            if snapshot["gauges"]:
+                st.table([{"Gauge": name, "Value": value} for name, value in sorted(snapshot["gauges"].items())])
+
+    def take_pooled(self, kind):
+        """
+        Pop a pre-generated passage of `kind` from the content pool, seeding its
+        precomputed analysis, and ask the pool to top itself back up (on the
+        server's key, if one is configured).
+        """
+        pool = get_content_pool()
+        entry = pool.pop(kind, self.language)
+        pool.request_refill(kind, self.language)
+        if entry is None:
+            return None
+        analysis = PassageAnalysis.from_dict(entry["analysis"])
+        if analysis.key == passage_key(analysis.text, self.difficulty_thresholds, self.language):
+            self.remember_analysis(analysis)
+        return entry["result"]
+
+    @instrument("fetch_random_quote", metric="sentensnap_ui_seconds")
     def fetch_random_quote(self):
         """
         Fetch a random quote from the backend and parse it.
         """
-        raw_response = self.senten_snap.generate_random_quote()
-        
-        if "error" in raw_response:
-            st.error(raw_response["error"])
-            return None
-        print("Quote Raw:", raw_response)
+        pooled = self.take_pooled("quote")
+        if pooled:
+            return pooled
+        raw_response = self.generate_live(self.senten_snap.stream_random_quote, ["Quote", "Author"])
+        if raw_response:
+            log_sampled("quote_generated", result=raw_response)
         return raw_response
 
+    def generate_live(self, stream, labels):
+        """
+        Generate a passage live, streaming its `labels` fields. Returns None
+        (after showing the error) if generation failed.
+        """
+        result = self.stream_result(stream(), labels)
+        if "error" in result:
+            st.error(result["error"])
+            return None
+        return result
+
+    def stream_result(self, rows, labels):
+        """
+        Render the `labels` fields of a streamed response as they arrive and
+        return the assembled result once the stream is complete.
+        """
+        placeholder = st.empty()
+        result = {}
+        for field, value in rows:
+            result[field] = value
+            if field in labels:
+                with placeholder.container():
+                    for label in labels:
+                        if label in result:
+                            st.write(f"**{label}:** {result[label]}")
+        placeholder.empty()  # The full section is rendered from session state below
+        return result
+
+    @instrument("fetch_definition", metric="sentensnap_ui_seconds")
     def fetch_definition(self, word):
         """
         Fetch a word snapshot from the backend and parse it.
@@ -367,27 +434,25 @@ class SentenSnapUI:
         raw_response["Word"] = word
         return raw_response
 
+    @instrument("fetch_random_book", metric="sentensnap_ui_seconds")
     def fetch_random_book(self):
         """
         Fetch a random book excerpt from the backend and parse it.
         """
-        raw_response = self.senten_snap.generate_random_book()
-        
-        if "error" in raw_response:
-            st.error(raw_response["error"])
-            return None
-        return raw_response
+        pooled = self.take_pooled("book")
+        if pooled:
+            return pooled
+        return self.generate_live(self.senten_snap.stream_random_book, ["Book Title", "Author", "Intro", "Excerpt"])
 
+    @instrument("fetch_random_knowledge", metric="sentensnap_ui_seconds")
     def fetch_random_knowledge(self):
         """
         Fetch a random piece of knowledge from the backend and parse it.
         """
-        raw_response = self.senten_snap.generate_random_knowledge()
-        
-        if "error" in raw_response:
-            st.error(raw_response["error"])
-            return None
-        return raw_response
+        pooled = self.take_pooled("knowledge")
+        if pooled:
+            return pooled
+        return self.generate_live(self.senten_snap.stream_random_knowledge, ["Knowledge", "Source"])
 
 
 # Main entry point for the Streamlit app
@@ -398,6 +463,12 @@ if __name__ == "__main__":
     if "definition_expanded" not in st.session_state:
         st.session_state["definition_expanded"] = False
 
+    start_exporters()
+    start_warmup()  # No-op under serve.py, which starts it with the server
+    rerun_start = time.perf_counter()
     ui = SentenSnapUI()
     ui.render_sidebar()
     ui.render_home_page()
+    rerun_seconds = time.perf_counter() - rerun_start
+    METRICS.observe("sentensnap_rerun_seconds", rerun_seconds)
+    ui.render_debug_panel(rerun_seconds)
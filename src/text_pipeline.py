@@ -0,0 +1,183 @@
+import re
+import hashlib
+import functools
+import threading
+from collections import OrderedDict, namedtuple
+
+from word_difficulty import DEFAULT_THRESHOLDS, get_difficulty_index
+
+# A word is a run of letters/digits that may contain internal apostrophes
+# (contractions, possessives) and internal hyphens (compounds). Em/en dashes,
+# quotes and other punctuation are never part of a token.
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['’ʼ][^\W_]+)*(?:[-‐‑][^\W_]+(?:['’ʼ][^\W_]+)*)*")
+
+APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'", "‐": "-", "‑": "-"})
+
+# "'s" forms that are contractions rather than possessives and are kept whole.
+S_CONTRACTIONS = frozenset({
+    "it's", "he's", "she's", "that's", "what's", "there's", "here's",
+    "let's", "who's", "where's", "how's", "when's", "why's",
+})
+
+# Elided articles and pronouns ("l'homme", "dell'arte") are split off so the word itself is ranked.
+ELISIONS = {
+    "fr": ("jusqu'", "lorsqu'", "puisqu'", "qu'", "l'", "d'", "j'", "m'", "n'", "s'", "t'", "c'"),
+    "it": ("dell'", "dall'", "nell'", "sull'", "all'", "quest'", "un'", "l'", "d'", "c'"),
+}
+
+Token = namedtuple("Token", ["text", "norm", "start", "end"])
+
+# Analyses kept as objects in this process, so reruns reuse their built word tables.
+ANALYSIS_MEMO_SIZE = 64
+
+
+class Tokenizer:
+    """
+    Language-specific token normalization on top of the shared token pattern.
+    """
+
+    __slots__ = ("lang", "elisions")
+
+    def __init__(self, lang="en"):
+        self.lang = lang
+        self.elisions = ELISIONS.get(lang, ())
+
+    def normalize(self, text):
+        """
+        Lowercase a token, fold curly apostrophes and Unicode hyphens to ASCII,
+        and strip English possessive "'s" or French/Italian elisions.
+        """
+        norm = text.translate(APOSTROPHES).lower()
+        if self.lang == "en":
+            if norm.endswith("'s") and norm not in S_CONTRACTIONS:
+                norm = norm[:-2]
+            return norm
+        for prefix in self.elisions:
+            if norm.startswith(prefix) and len(norm) > len(prefix):
+                return norm[len(prefix):]
+        return norm
+
+    def tokenize(self, text):
+        """
+        Split `text` into tokens, keeping each token's character offsets.
+        """
+        return [
+            Token(match.group(), self.normalize(match.group()), match.start(), match.end())
+            for match in TOKEN_PATTERN.finditer(text)
+        ]
+
+
+@functools.lru_cache(maxsize=16)
+def get_tokenizer(lang="en"):
+    """
+    Return the tokenizer for `lang`, created on first use.
+    """
+    return Tokenizer(lang)
+
+
+def normalize_token(text, lang="en"):
+    return get_tokenizer(lang).normalize(text)
+
+
+def tokenize(text, lang="en"):
+    return get_tokenizer(lang).tokenize(text)
+
+
+def passage_key(text, thresholds=DEFAULT_THRESHOLDS, lang="en"):
+    """
+    Identify an analysis by its passage text, language and the difficulty thresholds it used.
+    """
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return f"{digest}:{lang}:{thresholds[0]}:{thresholds[1]}"
+
+
+class PassageAnalysis:
+    """
+    Everything the UI derives from a generated passage, computed once.
+    `tokens` is None for an analysis restored from its stored form.
+    """
+
+    __slots__ = ("key", "text", "tokens", "words_with_difficulty", "html", "_word_table")
+
+    def __init__(self, key, text, tokens, words_with_difficulty, html):
+        self.key = key
+        self.text = text
+        self.tokens = tokens
+        self.words_with_difficulty = words_with_difficulty  # (word, difficulty, rank), hardest first
+        self.html = html
+        self._word_table = None
+
+    def word_table(self):
+        """
+        Return the columns of the clickable word table, built once per passage.
+        """
+        if self._word_table is None:
+            self._word_table = {
+                "Word": [word for word, _, _ in self.words_with_difficulty],
+                "Difficulty": [difficulty for _, difficulty, _ in self.words_with_difficulty],
+            }
+        return self._word_table
+
+    def to_dict(self):
+        """
+        Return a JSON-serializable form of the analysis (without its tokens,
+        which nothing reads once the words are ranked).
+        """
+        return {
+            "key": self.key,
+            "text": self.text,
+            "words_with_difficulty": [list(row) for row in self.words_with_difficulty],
+            "html": self.html,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["key"],
+            data["text"],
+            None,
+            [tuple(row) for row in data["words_with_difficulty"]],
+            data["html"],
+        )
+
+
+_analyses = OrderedDict()  # key -> PassageAnalysis, least recently used first
+_analyses_lock = threading.Lock()
+
+
+def get_memoized_analysis(key):
+    """
+    Return this process's analysis object for `key`, or None.
+    """
+    with _analyses_lock:
+        analysis = _analyses.get(key)
+        if analysis is not None:
+            _analyses.move_to_end(key)
+        return analysis
+
+
+def memoize_analysis(analysis):
+    """
+    Keep `analysis` as an object in this process, within ANALYSIS_MEMO_SIZE.
+    """
+    with _analyses_lock:
+        _analyses[analysis.key] = analysis
+        _analyses.move_to_end(analysis.key)
+        while len(_analyses) > ANALYSIS_MEMO_SIZE:
+            _analyses.popitem(last=False)
+
+
+def analyze_passage(text, thresholds=DEFAULT_THRESHOLDS, lang="en"):
+    """
+    Tokenize a passage in `lang`, rank its unique words by difficulty (hardest
+    first) and pre-render its display markup.
+    """
+    tokens = tokenize(text, lang)
+    unique_words = list(dict.fromkeys(token.norm for token in tokens))
+    words_with_difficulty = [
+        (word, difficulty, rank)
+        for word, difficulty, rank, _ in get_difficulty_index(lang).classify(unique_words, thresholds)
+    ]
+    words_with_difficulty.sort(key=lambda x: x[2], reverse=True)  # Sort by difficulty rank (higher rank = harder)
+    html = " ".join(f"<span style='font-size:18px; margin:4px;'>{word}</span>" for word in text.split())
+    return PassageAnalysis(passage_key(text, thresholds, lang), text, tokens, words_with_difficulty, html)
@@ -0,0 +1,227 @@
+"""
+Build study decks in bulk from a text file (e.g. a book chapter) or a word list.
+
+Words are streamed through the same tokenizer and difficulty index as the
+app, de-duplicated against the local dictionary and definition cache, and
+the rest are defined in concurrent batches through SentenSnap:
+
+    python src/vocab_cli.py chapter1.txt --output chapter1.apkg.txt --format anki
+    python src/vocab_cli.py words.txt --word-list --output words.csv --format csv --workers 8
+
+Every definition is appended to a checkpoint file as soon as it arrives, so
+an interrupted run continues where it stopped when started again with the
+same arguments. The Gemini key comes from --api-key or GEMINI_API_KEY;
+SENTENSNAP_BACKEND=fake runs offline against the fake backend.
+"""
+import os
+import sys
+import csv
+import html
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backends import backend_from_env
+from results import Definition, field_name
+from senten_snap import DEFINE_BATCH_SIZE, SentenSnap
+from text_pipeline import normalize_token, tokenize
+from word_difficulty import DIFFICULTY_LABELS, LANGUAGES, LEARNER_LEVELS, get_difficulty_index
+
+# Words are ranked in chunks of this many unique words.
+CLASSIFY_CHUNK_SIZE = 5000
+
+RANKS = {label: rank for rank, label in DIFFICULTY_LABELS.items()}
+
+
+def iter_words(path, word_list=False, lang="en"):
+    """
+    Stream normalized words from a text file (or one word per line), reading "-" as stdin.
+    """
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in f:
+            if word_list:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield normalize_token(line, lang)
+            else:
+                for token in tokenize(line, lang):
+                    yield token.norm
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def collect_vocabulary(words, thresholds, min_rank, lang="en"):
+    """
+    Return the unique `words` at or above `min_rank` as (word, difficulty) pairs, in order of first use.
+    """
+    unique = list(dict.fromkeys(word for word in words if any(char.isalpha() for char in word)))
+    vocabulary = []
+    index = get_difficulty_index(lang)
+    for start in range(0, len(unique), CLASSIFY_CHUNK_SIZE):
+        for word, label, rank, _ in index.classify(unique[start:start + CLASSIFY_CHUNK_SIZE], thresholds):
+            if rank >= min_rank:
+                vocabulary.append((word, label))
+    return vocabulary
+
+
+def make_record(word, difficulty, definition):
+    record = {"word": word, "difficulty": difficulty}
+    record.update((field_name(label), definition.get(label, "N/A")) for label in Definition.LABELS)
+    return record
+
+
+def load_checkpoint(path):
+    records = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by an interrupted run
+                records[record["word"]] = record
+    return records
+
+
+def define_vocabulary(senten_snap, vocabulary, checkpoint_path, workers, batch_size):
+    """
+    Define every word of `vocabulary` missing from the checkpoint, appending
+    results to it as they arrive. Returns (records by word, stats).
+    """
+    records = load_checkpoint(checkpoint_path)
+    difficulty = dict(vocabulary)
+    todo = [word for word, _ in vocabulary if word not in records]
+    stats = {"words": len(vocabulary), "resumed": len(vocabulary) - len(todo), "cached": 0, "generated": 0,
+             "failed": 0}
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        def save(word, definition):
+            if "error" in definition:
+                stats["failed"] += 1
+                return
+            records[word] = make_record(word, difficulty[word], definition)
+            checkpoint.write(json.dumps(records[word], ensure_ascii=False) + "\n")
+
+        known, pending = senten_snap.split_cached(todo)
+        for word, definition in known.items():
+            save(word, definition)
+        stats["cached"] = len(known)
+        checkpoint.flush()
+
+        if pending and not senten_snap.model:
+            raise SystemExit(f"{len(pending)} words need Gemini: pass --api-key or set GEMINI_API_KEY")
+
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        start_time = last_report = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentensnap-vocab") as executor:
+            futures = [executor.submit(senten_snap.define_words, chunk, batch_size) for chunk in chunks]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    for word, definition in future.result().items():
+                        save(word, definition)
+                        stats["generated"] += "error" not in definition
+                    checkpoint.flush()  # Everything defined so far survives an interruption
+                    now = time.perf_counter()
+                    if now - last_report < 0.5 and done < len(chunks):
+                        continue
+                    last_report = now
+                    print(f"\r{done}/{len(chunks)} batches, {stats['generated'] / (now - start_time):.1f} words/s",
+                          end="", file=sys.stderr, flush=True)
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                print("\nInterrupted; run the same command again to resume.", file=sys.stderr)
+                raise
+        if chunks:
+            print(file=sys.stderr)
+    return records, stats
+
+
+def write_jsonl(records, f):
+    for record in records:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def write_csv(records, f):
+    writer = csv.writer(f)
+    writer.writerow(["Word", "Difficulty"] + list(Definition.LABELS))
+    for record in records:
+        writer.writerow([record["word"], record["difficulty"]]
+                        + [record[field_name(label)] for label in Definition.LABELS])
+
+
+def write_anki(records, f):
+    """
+    Write tab-separated notes (front, back, tags) with the header lines Anki's importer reads.
+    """
+    f.write("#separator:tab\n#html:true\n#tags column:3\n")
+    for record in records:
+        back = (
+            f"<i>{html.escape(record['part_of_speech'])}</i> {html.escape(record['definition'])}"
+            f"<br><br>{html.escape(record['example_sentence'])}"
+            f"<br><br>Synonyms: {html.escape(record['synonyms'])}"
+        )
+        fields = [html.escape(record["word"]), back, f"sentensnap {record['difficulty'].lower()}"]
+        f.write("\t".join(field.replace("\t", " ").replace("\n", " ") for field in fields) + "\n")
+
+
+WRITERS = {"jsonl": write_jsonl, "csv": write_csv, "anki": write_anki}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Define every notable word of a text or word list in bulk.")
+    parser.add_argument("input", help="Text file or word list to read ('-' for stdin).")
+    parser.add_argument("--output", required=True, help="File to write the deck to.")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl", help="Output format (default: jsonl).")
+    parser.add_argument("--word-list", action="store_true", help="Treat the input as one word per line.")
+    parser.add_argument("--language", choices=list(LANGUAGES), default="en",
+                        help="Language of the input and the definitions (default: en).")
+    parser.add_argument("--level", choices=list(LEARNER_LEVELS), default="Intermediate",
+                        help="Learner level setting the difficulty thresholds (default: Intermediate).")
+    parser.add_argument("--min-difficulty", choices=["Easy", "Medium", "Hard"],
+                        help="Skip easier words (default: Medium for texts, Easy for word lists).")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent batch requests (default: 4).")
+    parser.add_argument("--batch-size", type=int, default=DEFINE_BATCH_SIZE,
+                        help="Words per Gemini request (default: %(default)s).")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint.jsonl).")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"), help="Gemini API key.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    min_difficulty = args.min_difficulty or ("Easy" if args.word_list else "Medium")
+    vocabulary = collect_vocabulary(
+        iter_words(args.input, args.word_list, args.language),
+        LEARNER_LEVELS[args.level],
+        RANKS[min_difficulty],
+        args.language,
+    )
+    ranked = time.perf_counter()
+    print(f"{len(vocabulary)} unique {min_difficulty}+ words in {ranked - start:.2f}s", file=sys.stderr)
+
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint.jsonl"
+    senten_snap = SentenSnap(gemini_api_key=args.api_key, model=backend_from_env(), language=args.language)
+    records, stats = define_vocabulary(senten_snap, vocabulary, checkpoint_path, args.workers, args.batch_size)
+
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        WRITERS[args.format]((records[word] for word, _ in vocabulary if word in records), f)
+    if not stats["failed"]:
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - start
+    defined = stats["cached"] + stats["generated"]
+    print(
+        f"Wrote {len(records)} words to {args.output}: {stats['resumed']} resumed, {stats['cached']} cached or "
+        f"local, {stats['generated']} generated, {stats['failed']} failed. "
+        f"{defined / elapsed:.1f} words/s overall, {len(vocabulary) / (ranked - start or 1e-9):.0f} words/s ranked.",
+        file=sys.stderr,
+    )
+    if stats["failed"]:
+        print(f"Failed words are retried by running the same command again ({checkpoint_path}).", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
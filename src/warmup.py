@@ -0,0 +1,117 @@
+"""
+Preload what the first page view of a fresh replica would otherwise wait for:
+the Gemini SDK (and a client, if a key is configured), the difficulty index
+and tokenizer of each warmup language, wordfreq's fallback tables, pandas
+(imported by the first `st.dataframe`), and the caches and stores.
+
+`serve.py` starts this in a background thread of the server process before
+any session connects (with plain `streamlit run`, the app script starts it
+on its first run instead), and `/ready` on the metrics port
+(SENTENSNAP_METRICS_PORT) answers 503 until it has finished. Run standalone,
+it only warms its own process: it reports each step's time and exits
+non-zero if one fails, which checks that an image can load everything:
+
+    python src/warmup.py
+    python src/warmup.py --languages en es
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+import threading
+
+from client_registry import get_client_registry, import_gemini
+from content_pool import get_content_pool
+from definition_cache import get_default_cache
+from local_dictionary import get_local_dictionary
+from metrics import METRICS, logger, register_readiness_check
+from shared_store import get_shared_store
+from text_pipeline import analyze_passage
+from word_difficulty import LANGUAGES
+
+# SENTENSNAP_WARMUP=0 leaves everything to load lazily on first use.
+WARMUP_ENABLED = os.environ.get("SENTENSNAP_WARMUP", "1") != "0"
+
+# Languages preloaded at startup; the others still load on first use.
+WARMUP_LANGUAGES = os.environ.get("SENTENSNAP_WARMUP_LANGUAGES", "en").split(",")
+
+# The hyphenated compound is missing from the index, so wordfreq's own lookup tables load as well.
+SAMPLE_PASSAGE = "A well-known passage warms up the tokenizer and the frequency index."
+
+
+def warmup(languages=None, api_key=None):
+    """
+    Run every warmup step and return {step: seconds}. Raises if a step fails.
+    """
+    languages = languages or WARMUP_LANGUAGES
+    api_key = api_key or os.environ.get("GEMINI_API_KEY")
+    steps = {}
+
+    def step(name, action):
+        start = time.perf_counter()
+        action()
+        steps[name] = time.perf_counter() - start
+        METRICS.observe("sentensnap_warmup_seconds", steps[name], step=name)
+
+    step("gemini_sdk", import_gemini)
+    if api_key:
+        step("gemini_client", lambda: get_client_registry().get_model(api_key))
+    for lang in languages:
+        step(f"index_{lang}", lambda: analyze_passage(SAMPLE_PASSAGE, lang=lang))
+    step("pandas", lambda: importlib.import_module("pandas"))
+    step("stores", lambda: (get_default_cache(), get_shared_store(), get_content_pool(), get_local_dictionary()))
+    return steps
+
+
+_status = {"state": "idle", "seconds": None, "error": None}
+_status_lock = threading.Lock()
+
+
+def start_warmup():
+    """
+    Start warming this process up in the background, once. Returns the status dictionary.
+    """
+    with _status_lock:
+        if _status["state"] != "idle" or not WARMUP_ENABLED:
+            return _status
+        _status["state"] = "running"
+    register_readiness_check(lambda: _status["state"] != "running")
+    METRICS.register_collector(lambda: {"sentensnap_warmup_ready": int(_status["state"] == "ready")})
+
+    def run():
+        start = time.perf_counter()
+        try:
+            warmup()
+            _status["state"] = "ready"
+        except Exception as e:
+            # Serve anyway: everything still loads lazily on first use.
+            logger.warning("Warmup failed: %s", e)
+            _status["state"], _status["error"] = "failed", str(e)
+        _status["seconds"] = time.perf_counter() - start
+
+    threading.Thread(target=run, name="sentensnap-warmup", daemon=True).start()
+    return _status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preload SentenSnap's frequency tables, client and stores.")
+    parser.add_argument("--languages", nargs="+", choices=list(LANGUAGES), default=WARMUP_LANGUAGES,
+                        help="Difficulty indexes to load (default: SENTENSNAP_WARMUP_LANGUAGES or en).")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"),
+                        help="Also build the Gemini client for this key.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        steps = warmup(args.languages, args.api_key)
+    except Exception as e:
+        print(f"Warmup failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    for name, seconds in steps.items():
+        print(f"{name:20s} {seconds * 1e3:8.1f} ms")
+    print(f"{'total':20s} {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DIFFICULTY_LABELS = {0: "Unknown", 1: "Easy", 2: "Medium", 3: "Hard"}
+
+# (easy, medium) Zipf cut-offs: a word is Easy above `easy`, Medium above
+# `medium` and Hard otherwise. Zipf 6 and 4 are the frequencies 1e-3 and 1e-5
+# the app has always used.
+DEFAULT_THRESHOLDS = (6.0, 4.0)
+
+LEARNER_LEVELS = {
+    "Beginner": (6.5, 4.5),
+    "Intermediate": DEFAULT_THRESHOLDS,
+    "Advanced": (5.0, 3.0),
+}
+
+# Languages learners can choose: wordfreq covers them and they are written with
+# spaces between words, so the regular tokenizer applies (Chinese and Japanese
+# would need a word segmenter).
+LANGUAGES = {
+    "en": "English",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "nl": "Dutch",
+    "sv": "Swedish",
+    "pl": "Polish",
+    "ru": "Russian",
+    "tr": "Turkish",
+}
+
+# Loaded indexes (2-55 MB per language, about 12 MB for English) stay resident
+# up to this many bytes; the least recently used languages are dropped first.
+INDEX_MEMORY_LIMIT = int(float(os.environ.get("SENTENSNAP_INDEX_MEMORY_MB", "128")) * 1024 * 1024)
+
+
+class DifficultyIndex:
+    """
+    Array-backed word frequency index for one language.
+
+    wordfreq's frequency list is loaded once into a sorted byte-string
+    vocabulary and a parallel float32 array of Zipf scores, so a whole token
+    list is scored with one `np.searchsorted` call instead of a
+    `wordfreq.word_frequency` call per word. Tokens missing from the list
+    (hyphenated compounds, numbers) fall back to wordfreq, which is only
+    imported once an index is built so importing this module stays cheap.
+    """
+
+    def __init__(self, lang="en"):
+        import wordfreq
+
+        self.lang = lang
+        words = []
+        zipfs = []
+        # Bucket i of the frequency list holds words with frequency 10 ** (-i / 100).
+        for bucket, bucket_words in enumerate(wordfreq.get_frequency_list(lang)):
+            words.extend(word.encode("utf-8") for word in bucket_words)
+            zipfs.extend([9.0 - bucket / 100.0] * len(bucket_words))
+        vocab = np.array(words)
+        order = np.argsort(vocab, kind="stable")
+        self.vocab = vocab[order]
+        self.zipf_scores = np.array(zipfs, dtype=np.float32)[order]
+
+    def __len__(self):
+        return len(self.vocab)
+
+    @property
+    def nbytes(self):
+        return self.vocab.nbytes + self.zipf_scores.nbytes
+
+    def zipf(self, words):
+        """
+        Return the Zipf frequency of every word in `words` as a float32 array.
+        """
+        words = list(words)
+        if not words:
+            return np.zeros(0, dtype=np.float32)
+        keys = np.array([word.encode("utf-8") for word in words], dtype=self.vocab.dtype)
+        positions = np.searchsorted(self.vocab, keys)
+        positions[positions == len(self.vocab)] = 0
+        found = self.vocab[positions] == keys
+        # Keys longer than the widest vocabulary entry are truncated by the dtype, so double-check them.
+        found &= np.array([len(word.encode("utf-8")) <= self.vocab.itemsize for word in words])
+        scores = np.where(found, self.zipf_scores[positions], np.float32(0))
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            import wordfreq
+        for i in missing:
+            try:
+                scores[i] = wordfreq.zipf_frequency(words[i], self.lang)
+            except Exception:
+                scores[i] = np.nan
+        return scores
+
+    def classify(self, words, thresholds=DEFAULT_THRESHOLDS):
+        """
+        Classify `words` in one vectorized pass.
+
+        Returns a list of (word, label, rank, zipf) tuples in input order, where
+        rank is 1 (Easy), 2 (Medium), 3 (Hard) or 0 (Unknown).
+        """
+        words = list(words)
+        scores = self.zipf(words)
+        easy, medium = thresholds
+        ranks = np.select([scores > easy, scores > medium], [1, 2], default=3)
+        ranks[np.isnan(scores)] = 0
+        return [
+            (word, DIFFICULTY_LABELS[rank], rank, float(score))
+            for word, rank, score in zip(words, ranks.tolist(), scores.tolist())
+        ]
+
+
+_indexes = OrderedDict()  # lang -> DifficultyIndex, least recently used first
+_indexes_lock = threading.Lock()
+_loading_locks = {}  # lang -> lock held while that index loads
+
+
+def get_difficulty_index(lang="en"):
+    """
+    Return the process-wide difficulty index for `lang`, loading it on first
+    use and keeping loaded indexes within INDEX_MEMORY_LIMIT.
+    """
+    with _indexes_lock:
+        index = _indexes.get(lang)
+        if index is not None:
+            _indexes.move_to_end(lang)
+            return index
+        loading = _loading_locks.setdefault(lang, threading.Lock())
+    # Other languages stay available while this one loads; callers for the same language wait for it.
+    with loading:
+        with _indexes_lock:
+            index = _indexes.get(lang)
+        if index is None:
+            index = DifficultyIndex(lang)
+    with _indexes_lock:
+        index = _indexes.setdefault(lang, index)
+        _indexes.move_to_end(lang)
+        while len(_indexes) > 1 and sum(loaded.nbytes for loaded in _indexes.values()) > INDEX_MEMORY_LIMIT:
+            _indexes.popitem(last=False)
+        return index
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import definition_cache  # noqa: E402
+from definition_cache import DefinitionCache  # noqa: E402
+
+DEFINITION = {"Definition": "The first letter.", "Part of Speech": "noun"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(definition_cache.time, "time", clock)
+    cache = DefinitionCache(path=str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.set("v1:alpha", DEFINITION)
+    clock.now += 59
+    assert cache.get("v1:alpha") == DEFINITION
+    clock.now += 2
+    assert cache.get("v1:alpha") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_disk_tier_outlives_the_memory_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DefinitionCache(path=path).set("v1:alpha", DEFINITION)
+    cache = DefinitionCache(path=path)  # Another process sharing the file
+    assert cache.get("v1:alpha") == DEFINITION
+    assert cache.stats["disk_hits"] == 1
+    assert cache.get("v1:alpha") == DEFINITION
+    assert cache.stats["memory_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(definition_cache.time, "time", clock)
+    cache = DefinitionCache(path=str(tmp_path / "cache.sqlite3"), memory_size=1, disk_size=10)
+    for i in range(64):  # Eviction runs every 64th write
+        clock.now += 1
+        cache.set(f"v1:word{i}", DEFINITION)
+        if i == 10:
+            cache.get("v1:word0")  # Touching an entry keeps it
+    count = cache._conn.execute("SELECT COUNT(*) FROM definitions").fetchone()[0]
+    assert count == 10
+    assert cache.get("v1:word63") == DEFINITION
+    assert cache.get("v1:word1") is None
+
+
+def test_memory_tier_is_bounded():
+    cache = DefinitionCache(path=None, memory_size=2)
+    for word in ("alpha", "beta", "gamma"):
+        cache.set(f"v1:{word}", DEFINITION)
+    assert cache.get("v1:alpha") is None
+    assert cache.get("v1:gamma") == DEFINITION
+    assert cache.stats["evictions"] == 1
+
+
+def test_unusable_directory_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    cache = DefinitionCache(path=str(blocker / "cache" / "cache.sqlite3"))
+    assert cache._conn is None
+    cache.set("v1:alpha", DEFINITION)
+    assert cache.get("v1:alpha") == DEFINITION
+
+
+def test_make_key_normalizes_the_word_and_scopes_other_languages():
+    assert DefinitionCache.make_key("  Alpha ", "v2") == DefinitionCache.make_key("alpha", "v2")
+    assert DefinitionCache.make_key("alpha", "v2", "es") != DefinitionCache.make_key("alpha", "v2")
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from scheduler import RateLimitedError, RequestScheduler  # noqa: E402
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class InvalidArgument(Exception):
+    pass
+
+
+def fail(error):
+    def call():
+        raise error
+    return call
+
+
+def open_scheduler(**kwargs):
+    """
+    Return a scheduler whose circuit has just opened and is due for a trial call.
+    """
+    scheduler = RequestScheduler(rate=1000, burst=1000, max_attempts=1, failure_threshold=1, reset_timeout=0.01,
+                                 **kwargs)
+    with pytest.raises(ServiceUnavailable):
+        scheduler.call(fail(ServiceUnavailable("503")))
+    assert scheduler.breaker.state == "open"
+    time.sleep(0.02)
+    return scheduler
+
+
+def test_non_retryable_trial_closes_the_circuit():
+    scheduler = open_scheduler()
+    with pytest.raises(InvalidArgument):
+        scheduler.call(fail(InvalidArgument("JSON mode is not supported")))
+    assert scheduler.breaker.state == "closed"
+    assert scheduler.call(lambda: "ok") == "ok"
+
+
+def test_unknown_trial_error_reopens_the_circuit():
+    scheduler = open_scheduler()
+    with pytest.raises(ValueError):
+        scheduler.call(fail(ValueError("bug")))
+    assert scheduler.breaker.state == "open"
+    time.sleep(0.02)
+    assert scheduler.call(lambda: "ok") == "ok"
+
+
+def test_rate_limited_call_does_not_take_the_trial():
+    scheduler = open_scheduler()
+    scheduler.bucket._tokens = 0
+    scheduler.bucket.rate = 0.001
+    scheduler.max_wait = 0
+    with pytest.raises(RateLimitedError):
+        scheduler.call(lambda: "ok")
+    assert scheduler.breaker.state == "open"
+    scheduler.bucket.rate = 1000
+    time.sleep(0.01)
+    assert scheduler.call(lambda: "ok") == "ok"
+
+
+def test_async_trial_outcomes_resolve_half_open():
+    scheduler = open_scheduler()
+
+    async def invalid():
+        raise InvalidArgument("bad request")
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(InvalidArgument):
+        asyncio.run(scheduler.call_async(invalid))
+    assert scheduler.breaker.state == "closed"
+
+    scheduler = open_scheduler()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(scheduler.call_async(slow), 0.01))
+    assert scheduler.breaker.state == "open"
+    time.sleep(0.02)
+    with pytest.raises(InvalidArgument):  # A new trial is let through, not CircuitOpenError
+        asyncio.run(scheduler.call_async(invalid))
+    assert scheduler.breaker.state == "closed"
@@ -0,0 +1,80 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from backends import FakeBackend  # noqa: E402
+from definition_cache import DefinitionCache  # noqa: E402
+from senten_snap import SentenSnap  # noqa: E402
+
+
+def make_snap(model=None):
+    return SentenSnap(model=model, cache=DefinitionCache(path=None), providers=[])
+
+
+def test_key_by_input_keys_every_spelling():
+    results = {"alpha": {"Definition": "a"}, "beta": {"Definition": "b"}}
+    keyed = SentenSnap.key_by_input(["alpha", "Alpha", " ALPHA ", "beta", "", "  "], results)
+    assert list(keyed) == ["alpha", "Alpha", " ALPHA ", "beta"]
+    assert keyed["Alpha"] is results["alpha"]
+
+
+def test_define_words_answers_every_spelling_with_one_definition():
+    model = FakeBackend()
+    results = make_snap(model).define_words(["alpha", "Alpha", "beta"])
+    assert list(results) == ["alpha", "Alpha", "beta"]
+    assert results["Alpha"] == results["alpha"]
+    assert results["alpha"]["Definition"] == "A fake definition of alpha."
+    assert model.calls == 1  # One batch prompt for the two unique words
+
+
+def test_define_words_without_a_model_reports_every_spelling():
+    results = make_snap().define_words(["x", "X"])
+    assert list(results) == ["x", "X"]
+    assert "error" in results["X"]
+
+
+def test_split_cached_serves_cached_words_and_dedupes_the_rest():
+    snap = make_snap()
+    snap.store_definition(snap.cache_key("alpha"), {"Definition": "cached"})
+    known, pending = snap.split_cached(["Alpha", "beta", "Beta", "alpha"])
+    assert known == {"Alpha": {"Definition": "cached"}}
+    assert pending == ["beta"]
+
+
+def test_multi_row_table_is_keyed_by_the_lowercased_key_field():
+    response = "\n".join([
+        "Here are the words:",
+        "| Word | Definition | Part of Speech |",
+        "|:-----|:-----------|:---------------|",
+        "| Alpha | The first letter. | noun |",
+        "| beta | Second | noun | extra |",  # Malformed: too many cells
+        "| gamma | The third letter. | noun |",
+    ])
+    parsed = make_snap().parse_table_response(response, key_field="Word")
+    assert parsed == {
+        "alpha": {"Definition": "The first letter.", "Part of Speech": "noun"},
+        "gamma": {"Definition": "The third letter.", "Part of Speech": "noun"},
+    }
+
+
+def test_multi_row_table_without_the_key_field_parses_to_nothing():
+    response = "| Term | Definition |\n|---|---|\n| alpha | a |"
+    assert make_snap().parse_table_response(response, key_field="Word") == {}
+
+
+def test_parse_table_row_skips_headers_and_separators_and_keeps_pipes():
+    assert SentenSnap.parse_table_row("| Field | Value |") is None
+    assert SentenSnap.parse_table_row("|-------|:-----:|") is None
+    assert SentenSnap.parse_table_row("Just some prose.") is None
+    assert SentenSnap.parse_table_row("| Quote | Either | or |") == ("Quote", "Either | or")
+    assert SentenSnap.parse_table_row("  Author | Seneca |") == ("Author", "Seneca")
+
+
+def test_iter_table_rows_joins_lines_split_across_chunks():
+    text = "| Field | Value |\n|---|---|\n| Quote | Know thyself. |\n| Author | Socrates |"
+    expected = [("Quote", "Know thyself."), ("Author", "Socrates")]
+    snap = make_snap()
+    for size in (1, 3, 7, len(text)):
+        chunks = [text[start:start + size] for start in range(0, len(text), size)]
+        assert list(snap.iter_table_rows(chunks)) == expected
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from text_pipeline import normalize_token, passage_key, tokenize  # noqa: E402
+
+
+def norms(text, lang="en"):
+    return [token.norm for token in tokenize(text, lang)]
+
+
+def test_curly_apostrophes_fold_and_possessives_are_stripped():
+    assert norms("It’s the dog’s bone") == ["it's", "the", "dog", "bone"]
+    assert norms("It's the dog's bone") == norms("It’s the dog’s bone")
+
+
+def test_contractions_are_kept_whole():
+    assert norms("Don't say what's left") == ["don't", "say", "what's", "left"]
+
+
+def test_dashes_and_quotes_are_never_part_of_a_token():
+    assert norms("Wait—“no”–stop -- now") == ["wait", "no", "stop", "now"]
+    assert norms("'quoted' words") == ["quoted", "words"]
+
+
+def test_compounds_keep_their_hyphens():
+    assert norms("A well‑known, state-of-the-art co-op") == ["a", "well-known", "state-of-the-art", "co-op"]
+
+
+def test_tokens_keep_their_offsets():
+    text = "Hello, brave new-world!"
+    for token in tokenize(text):
+        assert text[token.start:token.end] == token.text
+
+
+def test_elisions_are_split_off_in_french_and_italian():
+    assert norms("l’homme d'État", "fr") == ["homme", "état"]
+    assert norms("dell'arte", "it") == ["arte"]
+    assert normalize_token("l'", "fr") == "l'"  # Nothing left to rank after the elision
+
+
+def test_passage_key_depends_on_language_and_thresholds():
+    assert passage_key("Text", lang="en") != passage_key("Text", lang="fr")
+    assert passage_key("Text", (4.0, 3.0)) != passage_key("Text", (5.0, 3.0))